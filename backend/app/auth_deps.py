@@ -1,25 +1,60 @@
 from __future__ import annotations
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select, bindparam, lambda_stmt
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache import TTLCache
 from app.db import get_session
-from app.security import decode_token
+from app.security import decode_token_cached
 from app.models.user import User
 
 security = HTTPBearer()
 
+# Bursts from the same user (polling clients) collapse to one SELECT per few seconds
+_auth_users = TTLCache(maxsize=4096, ttl=5)
+
+@dataclass(frozen=True, slots=True)
+class AuthUser:
+    """The authenticated user's public columns: an immutable value, safe to share between requests."""
+    id: UUID
+    email: str
+    username: str
+    created_at: datetime
+
+# Only the public columns: password_hash never leaves the login query, and the narrow
+# row can be served from ix_users_id_covering
+_STMT_USER_BY_ID = lambda_stmt(
+    lambda: select(User.id, User.email, User.username, User.created_at)
+    .where(User.id == bindparam("uid"))
+)
+
+async def load_auth_user(session: AsyncSession, uid: str | UUID) -> AuthUser | None:
+    """Load the authenticated user in a single SELECT, memoized briefly per user id."""
+    key = str(uid)
+    user = _auth_users.get(key)
+    if user is None:
+        row = (await session.execute(_STMT_USER_BY_ID, {"uid": uid})).first()
+        if row is not None:
+            # Plain frozen value, not an ORM instance: nothing to lazy-load, mutate or attach
+            user = AuthUser(*row)
+            _auth_users.set(key, user)
+    return user
+
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security), 
+    credentials: HTTPAuthorizationCredentials = Depends(security),
     session: AsyncSession = Depends(get_session)
-) -> User:
+) -> AuthUser:
     token = credentials.credentials
     try:
-        data = decode_token(token)
+        data = decode_token_cached(token)
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token")
     if data.get("type") != "access":
         raise HTTPException(status_code=401, detail="Wrong token type")
-    user = await session.get(User, data.get("sub"))
+    user = await load_auth_user(session, data.get("sub"))
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
-    return user
\ No newline at end of file
+    return user
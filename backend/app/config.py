@@ -1,35 +1,62 @@
 from __future__ import annotations
-import os
-from pydantic import BaseModel
+from functools import lru_cache
+from typing import Annotated
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
-class Settings(BaseModel):
-    environment: str = os.getenv("ENVIRONMENT", "dev")
-    app_name: str = os.getenv("APP_NAME", "chally-api")
-    app_display_name: str = os.getenv("APP_DISPLAY_NAME", "Chally")
-    app_version: str = os.getenv("APP_VERSION", "0.1.0")
-    git_sha: str = os.getenv("GIT_SHA", "dev")
-    api_host: str = os.getenv("API_HOST", "0.0.0.0")
-    api_port: int = int(os.getenv("API_PORT", "8000"))
-    cors_origins: list[str] = os.getenv("CORS_ORIGINS", "*").split(",")
-    database_url: str = os.getenv("DATABASE_URL", "postgresql+asyncpg://postgres:postgres@db:5432/chally_dev")
-    redis_url: str = os.getenv("REDIS_URL", "redis://redis:6379/0")
-    s3_endpoint: str = os.getenv("S3_ENDPOINT", "http://minio:9000")
-    s3_access_key: str = os.getenv("S3_ACCESS_KEY", "minioadmin")
-    s3_secret_key: str = os.getenv("S3_SECRET_KEY", "minioadmin")
-    s3_bucket_uploads: str = os.getenv("S3_BUCKET_UPLOADS", "chally-uploads-dev")
+class Settings(BaseSettings):
+    # Field names map to upper-case env vars (e.g. database_url <- DATABASE_URL)
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False, extra="ignore")
+
+    environment: str = "dev"
+    app_name: str = "chally-api"
+    app_display_name: str = "Chally"
+    app_version: str = "0.1.0"
+    git_sha: str = "dev"
+    api_host: str = "0.0.0.0"
+    api_port: int = 8000
+    cors_origins: Annotated[tuple[str, ...], NoDecode] = ("*",)  # comma-separated in env
+    database_url: str = "postgresql+asyncpg://postgres:postgres@db:5432/chally_dev"
+    # Async engine pool (per worker process)
+    db_pool_size: int = 20
+    db_max_overflow: int = 20
+    db_pool_timeout: int = 10
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # Set when DATABASE_URL points at PgBouncer in transaction pooling mode
+    db_pgbouncer: bool = False
+    redis_url: str = "redis://redis:6379/0"
+    s3_endpoint: str = "http://minio:9000"
+    s3_access_key: str = "minioadmin"
+    s3_secret_key: str = "minioadmin"
+    s3_bucket_uploads: str = "chally-uploads-dev"
     # Media exposure controls
-    serve_media_via_api: bool = os.getenv("SERVE_MEDIA_VIA_API", "1") == "1"
-    s3_presign_downloads: bool = os.getenv("S3_PRESIGN_DOWNLOADS", "0") == "1"
-    s3_presign_expiry_seconds: int = int(os.getenv("S3_PRESIGN_EXPIRY_SECONDS", "300"))
-    
+    serve_media_via_api: bool = True
+    s3_presign_downloads: bool = False
+    s3_presign_expiry_seconds: int = 300
+    max_upload_bytes: int = 10 * 1024 * 1024  # per image upload
+
     # Stripe configuration
-    stripe_secret_key: str = os.getenv("STRIPE_SECRET_KEY", "")
-    stripe_webhook_secret: str = os.getenv("STRIPE_WEBHOOK_SECRET", "")
-    token_price_usd_cents: int = int(os.getenv("TOKEN_PRICE_USD_CENTS", "1"))
-    
+    stripe_secret_key: str = ""
+    stripe_webhook_secret: str = ""
+    token_price_usd_cents: int = 1
+
     # Withdrawal configuration
-    withdraw_mode: str = os.getenv("WITHDRAW_MODE", "refund")  # refund|disabled (Connect later)
-    max_deposit_tokens_day: int = int(os.getenv("MAX_DEPOSIT_TOKENS_DAY", "100000"))  # e.g. $1,000 if 1 token = 1 cent
-    refund_window_days: int = int(os.getenv("REFUND_WINDOW_DAYS", "90"))  # typical 90d
+    withdraw_mode: str = "refund"  # refund|disabled (Connect later)
+    max_deposit_tokens_day: int = 100000  # e.g. $1,000 if 1 token = 1 cent
+    refund_window_days: int = 90  # typical 90d
+
+    @field_validator("cors_origins", mode="before")
+    @classmethod
+    def split_origins(cls, v):
+        # Drop blanks so "" or "a.com," don't leave empty entries for CORSMiddleware to scan
+        if isinstance(v, str):
+            v = v.split(",")
+        return tuple(o.strip() for o in v if o and o.strip())
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Process-wide Settings singleton (override via dependency_overrides[get_settings] in tests)."""
+    return Settings()
 
-settings = Settings()
\ No newline at end of file
+settings = get_settings()
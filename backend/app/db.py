@@ -1,5 +1,7 @@
 from __future__ import annotations
 from typing import AsyncGenerator
+from uuid import uuid4
+from sqlalchemy.pool import NullPool
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 from app.config import settings
@@ -7,8 +9,30 @@ from app.config import settings
 class Base(DeclarativeBase):
     pass
 
-engine = create_async_engine(settings.database_url, future=True, echo=False)
+if settings.db_pgbouncer:
+    # PgBouncer owns pooling, and a transaction may land on a different server connection
+    # each time: no client-side pool, no statement cache, and unique prepared-statement
+    # names so they never collide across clients sharing a server connection.
+    _engine_kwargs = dict(
+        poolclass=NullPool,
+        connect_args={
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        },
+    )
+else:
+    _engine_kwargs = dict(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+
+engine = create_async_engine(settings.database_url, future=True, echo=False, **_engine_kwargs)
 SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+# Background jobs: one explicit transaction, no autoflush sweeps before each query
+VerifySessionLocal = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as session:
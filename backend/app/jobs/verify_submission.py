@@ -1,22 +1,17 @@
 from __future__ import annotations
 import asyncio
+import atexit
 from datetime import datetime, timezone as dt_tz, timedelta
-from zoneinfo import ZoneInfo
-from sqlalchemy import select
-from app.db import SessionLocal
+from sqlalchemy import select, func, update, cast
+from sqlalchemy.dialects.postgresql import BIT, JSONB
+from app.db import VerifySessionLocal, engine
 from app.models.submission import Submission
 from app.models.challenge import Challenge, Participant
-from app.schemas.challenge import RulesDSL
+from app.services.rules import challenge_rules
 from app.services.slots import compute_slot
+from app.services.time_windows import zone
 from app.services.overlay import overlay_code
 
-# Hamming distance for hex phash strings
-def _hamming_hex(a: str, b: str) -> int:
-    try:
-        return bin(int(a, 16) ^ int(b, 16)).count("1")
-    except Exception:
-        return 64  # treat as very different if bad data
-
 def _parse_exif_datetime(meta: dict) -> datetime | None:
     # piexif returns dict with "Exif" and tag 36867 (DateTimeOriginal) or 306 (0th DateTime)
     try:
@@ -30,22 +25,30 @@ def _parse_exif_datetime(meta: dict) -> datetime | None:
             raw = raw.decode(errors="ignore")
         if isinstance(raw, str) and len(raw) >= 19:
             # Format "YYYY:MM:DD HH:MM:SS"
+            # Rewrite the date separators and let the C fromisoformat parser do the rest
+            # (strptime goes through the pure-Python _strptime module and is several times slower)
             s = raw.replace("\x00", "").strip()
-            yyyy, mm, dd = s[0:4], s[5:7], s[8:10]
-            HH, MM, SS = s[11:13], s[14:16], s[17:19]
-            return datetime(int(yyyy), int(mm), int(dd), int(HH), int(MM), int(SS))
+            return datetime.fromisoformat(f"{s[0:4]}-{s[5:7]}-{s[8:19]}")
     except Exception:
         pass
     return None
 
 async def _run(submission_id: str):
-    async with SessionLocal() as session:
-        s = await session.get(Submission, submission_id)
-        if not s:
+    # Commits on exit from session.begin(); rolls back if any check raises
+    async with VerifySessionLocal() as session, session.begin():
+        # Submission, its challenge and participant in one round-trip
+        row = (
+            await session.execute(
+                select(Submission, Challenge, Participant)
+                .join(Challenge, Challenge.id == Submission.challenge_id)
+                .join(Participant, Participant.id == Submission.participant_id)
+                .where(Submission.id == submission_id)
+            )
+        ).one_or_none()
+        if row is None:
             return
-        ch = await session.get(Challenge, s.challenge_id)
-        p = await session.get(Participant, s.participant_id)
-        rules = RulesDSL.model_validate(ch.rules_json)
+        s, ch, p = row
+        rules = challenge_rules(ch)
 
         # Compute governing timezone & current window for the slot
         now = datetime.now(dt_tz.utc)
@@ -55,13 +58,15 @@ async def _run(submission_id: str):
         # NOTE: use stored window_start_utc/window_end_utc to avoid recomputing differently
         win_start, win_end = s.window_start_utc, s.window_end_utc
         tz_name = p.timezone if scope == "participant_local" else (ch_tz or "UTC")
+        # Read instrumented attributes once; the checks below branch on them repeatedly
+        meta = s.meta_json or {}
+        is_image = (s.mime_type or "").startswith("image/")
 
         # Collect checks
         checks_ok = True
         flags: list[str] = []
 
         # 1) Check for watermarking errors first
-        meta = s.meta_json or {}
         if meta.get("watermark_error"):
             checks_ok = False
             flags.append("watermark_error")
@@ -75,14 +80,14 @@ async def _run(submission_id: str):
                 flags.append("watermark_mismatch")
 
         # 3) EXIF required && within window (with small grace)
-        if rules.anti_cheat_exif_required and s.mime_type and s.mime_type.startswith("image/"):
-            exif_dt = _parse_exif_datetime(s.meta_json or {})
+        if rules.anti_cheat_exif_required and is_image:
+            exif_dt = _parse_exif_datetime(meta)
             if exif_dt is None:
                 checks_ok = False
                 flags.append("exif_missing")
             else:
                 # Treat EXIF as local time in governing tz (common cameras store local wall clock)
-                aware_local = exif_dt.replace(tzinfo=ZoneInfo(tz_name))
+                aware_local = exif_dt.replace(tzinfo=zone(tz_name))
                 exif_utc = aware_local.astimezone(dt_tz.utc)
                 # 5-minute grace on both ends to absorb clock skew
                 if not (win_start - timedelta(minutes=5) <= exif_utc <= win_end + timedelta(minutes=5)):
@@ -90,45 +95,60 @@ async def _run(submission_id: str):
                     flags.append("exif_out_of_window")
 
         # 4) Perceptual hash: prevent too-similar submissions from same user
-        ph = None
-        if rules.anti_cheat_phash_check and s.mime_type and s.mime_type.startswith("image/"):
-            # Use original phash (before watermarking) for duplicate detection
-            ph = (s.meta_json or {}).get("original_phash") or (s.meta_json or {}).get("phash")
-        if ph:
-            recent = (
+        ph = s.phash_bits if rules.anti_cheat_phash_check and is_image else None
+        if ph is not None:
+            # Hamming distance computed by Postgres: popcount(prev XOR current) over the last 8;
+            # rows without a phash yield NULL and are ignored
+            distances = (
                 await session.execute(
-                    select(Submission)
+                    select(func.bit_count(cast(Submission.phash_bits.op("#")(ph), BIT(64))))
                     .where(Submission.participant_id == s.participant_id, Submission.id != s.id)
                     .order_by(Submission.submitted_at.desc())
                     .limit(8)
                 )
             ).scalars().all()
-            too_similar = False
-            for prev in recent:
-                # Use original phash for comparison (before watermarking)
-                prev_ph = (prev.meta_json or {}).get("original_phash") or (prev.meta_json or {}).get("phash")
-                if prev_ph:
-                    if _hamming_hex(ph, prev_ph) <= 5:
-                        too_similar = True
-                        break
+            too_similar = any(d is not None and d <= 5 for d in distances)
             if too_similar:
                 checks_ok = False
                 flags.append("phash_duplicate_like")
 
-        # Update submission
-        meta = dict(s.meta_json or {})
-        if flags:
-            meta["flags"] = flags
-
         # Mode handling
         if rules.verification.mode == "auto" and checks_ok:
-            s.status = "accepted"
+            new_status = "accepted"
         else:
             # route to quorum or manual review
-            s.status = "pending"
-        s.meta_json = meta
-        await session.commit()
+            new_status = "pending"
+
+        # Update submission; flags are merged into meta_json server-side (meta_json || {"flags": ...})
+        # so the rest of the JSONB document is neither copied here nor sent back to Postgres
+        values: dict = {"status": new_status}
+        if flags:
+            values["meta_json"] = Submission.meta_json.op("||")(cast({"flags": flags}, JSONB))
+        await session.execute(
+            update(Submission)
+            .where(Submission.id == s.id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+# One event loop per worker process. asyncio.run() per job would build and tear down a loop
+# each time, and pooled asyncpg connections are bound to the loop that opened them.
+_loop: asyncio.AbstractEventLoop | None = None
+
+def _worker_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop
+
+def _close_worker_loop() -> None:
+    if _loop is not None and not _loop.is_closed():
+        _loop.run_until_complete(engine.dispose())
+        _loop.close()
+
+# Registered once per process; a no-op if no job ever created the loop
+atexit.register(_close_worker_loop)
 
 def verify_submission(submission_id: str):
-    # RQ entry point (sync); run the async coroutine
-    asyncio.run(_run(submission_id))
\ No newline at end of file
+    # RQ entry point (sync); run the async coroutine on the worker's persistent loop
+    _worker_loop().run_until_complete(_run(submission_id))
\ No newline at end of file
@@ -1,24 +1,29 @@
 from __future__ import annotations
 import logging, sys
+import orjson
 import structlog
 import structlog.stdlib
 
+def _dumps(obj, default=None, **_) -> str:
+    # orjson encodes in C; structlog's fallback handler still covers odd values via default
+    return orjson.dumps(obj, default=default).decode()
+
 def configure_logging():
-    timestamper = structlog.processors.TimeStamper(fmt="iso")
+    timestamper = structlog.processors.TimeStamper(fmt="iso", utc=True)
+    renderer = structlog.processors.JSONRenderer(serializer=_dumps)
     structlog.configure(
         processors=[
             structlog.contextvars.merge_contextvars,
             timestamper,
             structlog.processors.add_log_level,
             structlog.processors.EventRenamer("message"),
-            structlog.processors.JSONRenderer(),
+            renderer,
         ],
         wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
         cache_logger_on_first_use=True,
     )
     handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(structlog.stdlib.ProcessorFormatter(structlog.processors.JSONRenderer()))
+    handler.setFormatter(structlog.stdlib.ProcessorFormatter(renderer))
     root = logging.getLogger()
     root.handlers = [handler]
     root.setLevel(logging.INFO)
-    
\ No newline at end of file
@@ -1,9 +1,8 @@
 from __future__ import annotations
-import uuid
+import secrets
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.security import HTTPBearer
 from app.config import settings
 from app.logging_setup import configure_logging
 from app.routes.system import router as system_router
@@ -34,12 +33,9 @@ app = FastAPI(
     description=f"{settings.app_display_name} API for peer accountability challenges"
 )
 
-# Add security scheme for Swagger UI
-security = HTTPBearer()
-
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"] if settings.environment == "dev" else settings.cors_origins,
+    allow_origins=("*",) if settings.environment == "dev" else settings.cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -52,15 +48,37 @@ app.include_router(challenges_router)
 app.include_router(feed_router)
 app.include_router(reviews_router)
 app.include_router(ledger_router)
-app.include_router(wallet_router) 
+app.include_router(wallet_router)
 app.include_router(stripe_router)
 
-@app.middleware("http")
-async def add_request_id(request: Request, call_next):
-    rid = request.headers.get("x-request-id") or str(uuid.uuid4())
-    request.state.request_id = rid
-    structlog.contextvars.bind_contextvars(request_id=rid)
-    response: Response = await call_next(request)
-    response.headers["X-Request-ID"] = rid
-    structlog.contextvars.clear_contextvars()
-    return response
\ No newline at end of file
+class RequestIDMiddleware:
+    """Pure ASGI middleware: tags each request with an id without BaseHTTPMiddleware's task/stream overhead."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        rid = _find_header(scope["headers"], b"x-request-id") or secrets.token_hex(16)
+        scope.setdefault("state", {})["request_id"] = rid  # exposed as request.state.request_id
+        rid_header = (b"x-request-id", rid.encode("latin-1"))
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), rid_header]
+            await send(message)
+
+        tokens = structlog.contextvars.bind_contextvars(request_id=rid)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            structlog.contextvars.reset_contextvars(**tokens)
+
+def _find_header(headers, name: bytes) -> str | None:
+    for key, value in headers:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+app.add_middleware(RequestIDMiddleware)
@@ -1,13 +1,16 @@
 from __future__ import annotations
 import uuid
 from datetime import datetime
+from functools import cached_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, DateTime, func, ForeignKey, Text
+from sqlalchemy import String, Integer, DateTime, func, ForeignKey, Text, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from app.db import Base
 
 class Challenge(Base):
     __tablename__ = "challenges"
+    # Fetch server defaults (created_at) via INSERT ... RETURNING instead of a refresh SELECT
+    __mapper_args__ = {"eager_defaults": True}
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     owner_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
     name: Mapped[str] = mapped_column(String(120), nullable=False)
@@ -19,14 +22,32 @@ class Challenge(Base):
     entry_stake_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     rules_json: Mapped[dict] = mapped_column(JSONB, nullable=False)
     status: Mapped[str] = mapped_column(String(16), nullable=False, default="active")  # draft|active|ended
+    # Denormalized COUNT(participants); bumped in the same transaction as each participant insert
+    participant_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default=text("0"))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Challenge image fields
     image_storage_key: Mapped[str | None] = mapped_column(String(255), nullable=True)
     image_mime_type: Mapped[str | None] = mapped_column(String(100), nullable=True)
 
+    # rules_json is never edited after create, so these are derived once per instance
+    @cached_property
+    def tz_scope(self) -> str:
+        return ((self.rules_json or {}).get("time_window") or {}).get("scope") or "participant_local"
+
+    @cached_property
+    def challenge_tz(self) -> str | None:
+        return ((self.rules_json or {}).get("time_window") or {}).get("timezone")
+
+    @cached_property
+    def default_participant_tz(self) -> str:
+        """Timezone for a participant who didn't send one: the challenge tz if it governs, else UTC."""
+        return self.challenge_tz if self.tz_scope == "challenge_tz" and self.challenge_tz else "UTC"
+
 class Participant(Base):
     __tablename__ = "participants"
+    # joined_at comes back from the INSERT via RETURNING (no refresh SELECT)
+    __mapper_args__ = {"eager_defaults": True}
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     challenge_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("challenges.id", ondelete="CASCADE"), index=True, nullable=False)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
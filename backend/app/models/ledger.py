@@ -2,7 +2,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Integer, DateTime, ForeignKey, UniqueConstraint, func
+from sqlalchemy import String, Integer, DateTime, ForeignKey, UniqueConstraint, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 from app.db import Base
 
@@ -26,7 +26,7 @@ class Ledger(Base):
         UUID(as_uuid=True), ForeignKey("challenges.id", ondelete="CASCADE"), index=True, nullable=False
     )
     participant_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), index=True, nullable=False
+        UUID(as_uuid=True), nullable=False
         # NOTE: Not using FK constraint to allow special platform participant ID 00000000-0000-0000-0000-000000000000
     )
 
@@ -44,4 +44,6 @@ class Ledger(Base):
     __table_args__ = (
         # Allows only one (participant, type, submission) penalty per submission, and harmless for stake/payout (ref null)
         UniqueConstraint("participant_id", "type", "ref_submission_id", name="uq_ledger_unique_ref"),
+        # Entries of one type for a participant over a time window (platform revenue stats)
+        Index("ix_ledger_participant_type_created", "participant_id", "type", created_at.desc()),
     )
\ No newline at end of file
@@ -2,18 +2,20 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Text, DateTime, ForeignKey, UniqueConstraint, func
+from sqlalchemy import String, Text, DateTime, ForeignKey, UniqueConstraint, Index, BigInteger, func
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from app.db import Base
 
 
 class Submission(Base):
     __tablename__ = "submissions"
+    # submitted_at comes back from the INSERT via RETURNING (no refresh SELECT)
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
     challenge_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("challenges.id", ondelete="CASCADE"), index=True, nullable=False
+        UUID(as_uuid=True), ForeignKey("challenges.id", ondelete="CASCADE"), nullable=False
     )
     participant_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("participants.id", ondelete="CASCADE"), index=True, nullable=False
@@ -47,4 +49,27 @@ class Submission(Base):
     storage_key: Mapped[str | None] = mapped_column(Text(), nullable=True)
     mime_type: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
-    meta_json: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
\ No newline at end of file
+    meta_json: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    # Latest image phash as signed 64-bit int (mirrors meta_json["phash"]); Hamming distance runs in SQL
+    phash_bits: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+
+    __table_args__ = (
+        # Recent submissions per participant (phash duplicate check in verify job)
+        # id/phash_bits in the leaf let the verify job's lookup run as an index-only scan
+        Index(
+            "ix_submissions_participant_submitted",
+            "participant_id",
+            submitted_at.desc(),
+            postgresql_include=["id", "phash_bits"],
+        ),
+        # Newest-first submission pages per challenge, keyset on (submitted_at, id)
+        # (also serves plain challenge_id lookups)
+        Index("ix_submissions_challenge_submitted", "challenge_id", submitted_at.desc(), id.desc()),
+        # Review lists/stats: one challenge, one status, newest first
+        Index("ix_submissions_challenge_status_submitted", "challenge_id", "status", submitted_at.desc()),
+        # Same pages filtered to one slot day (list_submissions?day=...)
+        Index("ix_submissions_challenge_slot_submitted", "challenge_id", "slot_key", submitted_at.desc(), id.desc()),
+        # One row per sequence number in a slot: concurrent submits racing for the same
+        # sequence (and so the same ordered stage / max-per-slot seat) collide here
+        Index("uq_submissions_participant_slot_sequence", "participant_id", "slot_key", "submission_sequence", unique=True),
+    )
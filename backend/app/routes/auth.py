@@ -1,25 +1,49 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends, HTTPException, status, Header
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select, bindparam, lambda_stmt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from app.db import get_session
 from app.models.user import User
 from app.schemas.auth import RegisterRequest, LoginRequest, UserPublic, TokenPair
-from app.security import hash_password, verify_password, make_access_token, make_refresh_token, decode_token
+from app.security import hash_password, hash_password_async, verify_password_async, make_access_token, make_refresh_token, decode_token_cached
+from app.auth_deps import load_auth_user
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+# Hot lookups as lambda statements: built and cache-keyed once, only the bound value varies per call
+_STMT_USER_BY_EMAIL = lambda_stmt(lambda: select(User).where(User.email == bindparam("email")))
+_STMT_USER_BY_USERNAME = lambda_stmt(lambda: select(User).where(User.username == bindparam("username")))
+
+# auto_error=False so each endpoint keeps its own "Missing ... token" 401 instead of FastAPI's 403
+bearer = HTTPBearer(auto_error=False)
+
+# Login passwords beyond this are rejected before touching the hasher (register caps at 128 via schema)
+_MAX_PASSWORD_LEN = 1024
+
+# Verified against when the email is unknown, so both login failure paths cost one bcrypt check
+_DUMMY_HASH = hash_password("not-a-real-password")
+
+async def _token_claims(credentials: HTTPAuthorizationCredentials | None = Depends(bearer)) -> dict | None:
+    """Decoded claims of the bearer token (None when absent); resolved once per request."""
+    if credentials is None:
+        return None
+    try:
+        return decode_token_cached(credentials.credentials)
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
 @router.post("/register", status_code=201, response_model=UserPublic)
 async def register(payload: RegisterRequest, session: AsyncSession = Depends(get_session)):
     uname = payload.username.lower()
-    exists_email = await session.scalar(select(User).where(User.email == payload.email))
+    exists_email = await session.scalar(_STMT_USER_BY_EMAIL, {"email": payload.email})
     if exists_email:
         raise HTTPException(status_code=409, detail="Email already registered")
-    exists_username = await session.scalar(select(User).where(User.username == uname))
+    exists_username = await session.scalar(_STMT_USER_BY_USERNAME, {"username": uname})
     if exists_username:
         raise HTTPException(status_code=409, detail="Username taken")
-    user = User(email=payload.email, username=uname, password_hash=hash_password(payload.password))
+    user = User(email=payload.email, username=uname, password_hash=await hash_password_async(payload.password))
     session.add(user)
     try:
         await session.commit()
@@ -31,38 +55,33 @@ async def register(payload: RegisterRequest, session: AsyncSession = Depends(get
 
 @router.post("/login", response_model=TokenPair)
 async def login(payload: LoginRequest, session: AsyncSession = Depends(get_session)):
-    user = await session.scalar(select(User).where(User.email == payload.email))
-    if not user or not verify_password(payload.password, user.password_hash):
+    if len(payload.password) > _MAX_PASSWORD_LEN:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    user = await session.scalar(_STMT_USER_BY_EMAIL, {"email": payload.email})
+    if user is None:
+        await verify_password_async(payload.password, _DUMMY_HASH)
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if not await verify_password_async(payload.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     return TokenPair(access=make_access_token(str(user.id)), refresh=make_refresh_token(str(user.id)))
 
 @router.post("/refresh", response_model=TokenPair)
-async def refresh(authorization: str | None = Header(None)):
-    if not authorization or not authorization.lower().startswith("bearer "):
+async def refresh(data: dict | None = Depends(_token_claims)):
+    if data is None:
         raise HTTPException(status_code=401, detail="Missing refresh token")
-    token = authorization.split(" ", 1)[1]
-    try:
-        data = decode_token(token)
-    except Exception:
-        raise HTTPException(status_code=401, detail="Invalid token")
     if data.get("type") != "refresh":
         raise HTTPException(status_code=401, detail="Wrong token type")
     sub = data.get("sub")
     return TokenPair(access=make_access_token(sub), refresh=make_refresh_token(sub))
 
 @router.get("/me", response_model=UserPublic)
-async def me(authorization: str | None = Header(None), session: AsyncSession = Depends(get_session)):
-    if not authorization or not authorization.lower().startswith("bearer "):
+async def me(data: dict | None = Depends(_token_claims), session: AsyncSession = Depends(get_session)):
+    if data is None:
         raise HTTPException(status_code=401, detail="Missing access token")
-    token = authorization.split(" ", 1)[1]
-    try:
-        data = decode_token(token)
-    except Exception:
-        raise HTTPException(status_code=401, detail="Invalid token")
     if data.get("type") != "access":
         raise HTTPException(status_code=401, detail="Wrong token type")
     user_id = data.get("sub")
-    user = await session.get(User, user_id)
+    user = await load_auth_user(session, user_id)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     return UserPublic(id=user.id, email=user.email, username=user.username, created_at=user.created_at)
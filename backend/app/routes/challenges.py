@@ -1,71 +1,112 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends, HTTPException, Query, Header, Body, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Header, Body, UploadFile, File
+from fastapi.responses import RedirectResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, exists
+from sqlalchemy import select, func, exists, insert, update, and_, literal, bindparam, lambda_stmt, DateTime, tuple_
 from app.db import get_session
 from app.auth_deps import get_current_user
 from app.models.challenge import Challenge, Participant
 from app.models.user import User
 from app.models.submission import Submission
-from app.schemas.challenge import ChallengeCreate, ChallengePublic, ParticipantPublic, RulesDSL, ParticipantWithUser
+from app.schemas.challenge import ChallengeCreate, ChallengePublic, ParticipantPublic, ParticipantWithUser
 from app.schemas.submission import SubmissionPublic, LeaderboardRow
 from app.services.invite_code import generate_code
-from app.services.media import analyze_image, ext_for_mime
-from app.services.storage import put_bytes, get_bytes, presign_get
+from app.services.media import analyze_image, ext_for_mime, phash_to_bits, read_upload, UploadTooLarge
+from app.services.storage import put_bytes_async, delete_object_async, open_object_async, presign_get_cached, media_url
 from app.config import settings
 from app.services.slots import compute_slot
+from app.services.time_windows import local_today
 from app.services.wallet import debit_tokens, InsufficientFunds
 from app.services.overlay import overlay_code
+from app.services.rules import challenge_rules
+from app.cache import TTLCache
 from sqlalchemy.exc import IntegrityError
+from pydantic import ValidationError
+from sqlalchemy.orm import raiseload, make_transient_to_detached, load_only
 from datetime import datetime, timezone as dt_tz, timedelta
-from zoneinfo import ZoneInfo
 import uuid
 from rq import Queue
 from redis import Redis
 from app.jobs.verify_submission import verify_submission
 import os
 from app.models.ledger import Ledger
-from app.services.ledger import ensure_stake_entry
+from app.services.ledger import add_stake_entry
+import structlog
 
 router = APIRouter(prefix="/challenges", tags=["challenges"])
+log = structlog.get_logger()
 
 # RQ queue (lazy single instance)
 _redis = Redis.from_url(os.getenv("REDIS_URL", "redis://redis:6379/0"))
-q = Queue("default", connection=_redis)
+rq_queue = Queue("default", connection=_redis)
+
+# Per-request lookups as lambda statements (expression tree and cache key built once)
+_STMT_PARTICIPANT_EXISTS = lambda_stmt(
+    lambda: select(exists().where(Participant.challenge_id == bindparam("cid"), Participant.user_id == bindparam("uid")))
+)
+
+# (challenge_id, user_id) -> participant_id for the watermark-code poll; memberships are
+# never removed, so the TTL only bounds memory
+_watermark_participants = TTLCache(maxsize=4096, ttl=60)
+
+_TERMINAL_STATUSES = frozenset(("canceled", "deleted"))
+# (now < starts_at, now <= ends_at) -> runtime state
+_RUNTIME_STATE = {
+    (True, True): "upcoming",
+    (True, False): "upcoming",  # ends_at before starts_at: still not started
+    (False, True): "started",
+    (False, False): "ended",
+}
+
+def is_participant_of(user_id):
+    """Correlated EXISTS column: is user_id a participant of the challenge on this row."""
+    return (
+        exists().where(Participant.challenge_id == Challenge.id, Participant.user_id == user_id)
+        .label("is_participant")
+    )
+
+def as_challenge_id(challenge_id: str) -> uuid.UUID | None:
+    """Parse a path id; None for malformed ids (callers answer 404 like for a missing row)."""
+    try:
+        return uuid.UUID(challenge_id)
+    except ValueError:
+        return None
 
 def compute_runtime_state(ch: Challenge, now: datetime) -> str:
-    if ch.status in ("canceled", "deleted"):
-        return ch.status
-    if now < ch.starts_at:
-        return "upcoming"
-    if ch.starts_at <= now <= ch.ends_at:
-        return "started"
-    return "ended"
-
-async def hydrate_public(session: AsyncSession, ch: Challenge, user_id) -> ChallengePublic:
-    now = datetime.now(dt_tz.utc)
-    participant_count = await session.scalar(
-        select(func.count()).select_from(Participant).where(Participant.challenge_id == ch.id)
-    )
+    status = ch.status
+    if status in _TERMINAL_STATUSES:
+        return status
+    return _RUNTIME_STATE[(now < ch.starts_at, now <= ch.ends_at)]
+
+async def hydrate_public(session: AsyncSession, ch: Challenge, user_id, now: datetime | None = None) -> ChallengePublic:
+    # Count is the participant_count column, so membership is the only lookup left; owners are
+    # enrolled as participant #1 by create_challenge and need none
+    if ch.owner_id == user_id:
+        is_participant = True
+    else:
+        is_participant = await session.scalar(_STMT_PARTICIPANT_EXISTS, {"cid": ch.id, "uid": user_id})
+    return hydrate_from_row(ch, ch.participant_count, is_participant, user_id, now or datetime.now(dt_tz.utc))
+
+def hydrate_from_row(ch: Challenge, participant_count, is_participant, user_id, now: datetime) -> ChallengePublic:
+    """Build ChallengePublic from already-fetched counts (no DB I/O); used by list endpoints."""
     is_owner = (ch.owner_id == user_id)
-    is_participant = await session.scalar(
-        select(exists().where(Participant.challenge_id == ch.id, Participant.user_id == user_id))
-    )
     # Generate presigned URL for image if available
     image_url = None
     has_image = bool(ch.image_storage_key)
     if has_image:
         try:
-            image_url = presign_get(ch.image_storage_key)
+            image_url = presign_get_cached(ch.image_storage_key)
         except Exception:
             # If presigning fails, still mark has_image as True but no URL
             pass
     
-    return ChallengePublic(
+    # Every value comes from a DB row of known column types or the cached, already-validated
+    # RulesDSL, so build without re-running validation for each row of a list response
+    return ChallengePublic.model_construct(
         id=ch.id, owner_id=ch.owner_id, name=ch.name, description=ch.description,
         visibility=ch.visibility, invite_code=ch.invite_code,
         starts_at=ch.starts_at, ends_at=ch.ends_at, entry_stake_tokens=ch.entry_stake_tokens,
-        rules=RulesDSL.model_validate(ch.rules_json),
+        rules=challenge_rules(ch),
         status=ch.status, created_at=ch.created_at,
         participant_count=int(participant_count or 0),
         is_owner=is_owner,
@@ -75,13 +116,56 @@ async def hydrate_public(session: AsyncSession, ch: Challenge, user_id) -> Chall
         has_image=has_image,
     )
 
+async def _unused_invite_code(session: AsyncSession, candidates: int = 3) -> str:
+    """Pick an invite code not already taken, checking several candidates in one SELECT."""
+    codes = [generate_code() for _ in range(candidates)]
+    taken = set((await session.execute(
+        select(Challenge.invite_code).where(Challenge.invite_code.in_(codes))
+    )).scalars())
+    return next((c for c in codes if c not in taken), codes[0])
+
+def _column_values(obj) -> dict:
+    return {a.key: getattr(obj, a.key) for a in type(obj).__mapper__.column_attrs if a.key in obj.__dict__}
+
+async def _insert_challenge_with_owner(session: AsyncSession, ch: Challenge, owner: Participant) -> None:
+    """
+    INSERT the challenge and its owner participant in one statement (chained data-modifying CTEs),
+    then attach both objects to the session as persistent so later changes flush as UPDATEs.
+    Both objects must carry every column value (ids included) except server defaults.
+    """
+    new_ch = (
+        insert(Challenge).values(**_column_values(ch))
+        .returning(Challenge.id, Challenge.created_at)
+        .cte("new_ch")
+    )
+    owner_cols = _column_values(owner)
+    owner_cols.pop("challenge_id")
+    new_owner = (
+        insert(Participant)
+        .from_select(
+            [*owner_cols, "challenge_id"],
+            select(
+                *(literal(v, Participant.__table__.c[k].type) for k, v in owner_cols.items()),
+                new_ch.c.id,
+            ),
+        )
+        .returning(Participant.joined_at)
+        .cte("new_owner")
+    )
+    ch.created_at, owner.joined_at = (
+        await session.execute(select(new_ch.c.created_at, new_owner.c.joined_at))
+    ).one()
+    for obj in (ch, owner):
+        make_transient_to_detached(obj)
+        session.add(obj)
+
 def to_public(ch: Challenge) -> ChallengePublic:
     # Legacy helper - keeping for backward compatibility but prefer hydrate_public
     return ChallengePublic(
         id=ch.id, owner_id=ch.owner_id, name=ch.name, description=ch.description,
         visibility=ch.visibility, invite_code=ch.invite_code,
         starts_at=ch.starts_at, ends_at=ch.ends_at, entry_stake_tokens=ch.entry_stake_tokens,
-        rules=RulesDSL.model_validate(ch.rules_json),
+        rules=challenge_rules(ch),
         status=ch.status, created_at=ch.created_at,
         participant_count=0, is_owner=False, is_participant=False, runtime_state="upcoming"
     )
@@ -95,21 +179,21 @@ async def create_challenge(
     image: UploadFile | None = File(default=None, description="Optional challenge image"),
 ):
     # Parse the JSON payload
+    # model_validate_json parses and validates in one pass in pydantic-core (no dict round-trip)
     try:
-        import json
-        payload_dict = json.loads(payload)
-        challenge_data = ChallengeCreate.model_validate(payload_dict)
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=422, detail="Invalid JSON in payload")
-    except Exception as e:
+        challenge_data = ChallengeCreate.model_validate_json(payload)
+    except ValidationError as e:
+        if any(err["type"] == "json_invalid" for err in e.errors()):
+            raise HTTPException(status_code=422, detail="Invalid JSON in payload")
         raise HTTPException(status_code=422, detail=f"Invalid challenge data: {str(e)}")
     
     if challenge_data.ends_at <= challenge_data.starts_at:
         raise HTTPException(status_code=422, detail="ends_at must be after starts_at")
-    # Generate a unique invite code (retry on collision)
+    # Generate a unique invite code; the IntegrityError retry only covers a concurrent insert race
     for _ in range(5):
-        code = generate_code()
+        code = await _unused_invite_code(session)
         ch = Challenge(
+            id=uuid.uuid4(),
             owner_id=user.id,
             name=challenge_data.name,
             description=challenge_data.description,
@@ -120,23 +204,15 @@ async def create_challenge(
             entry_stake_tokens=challenge_data.entry_stake_tokens,
             rules_json=challenge_data.rules.model_dump(mode='json'),
             status="active",
+            participant_count=1,  # the owner, inserted together below
+            image_storage_key=None,
+            image_mime_type=None,
         )
-        session.add(ch)
+        # Owner becomes participant #1; ids are assigned here since the stake external_id needs them
+        owner_tz = x_client_tz or ch.default_participant_tz
+        owner_part = Participant(id=uuid.uuid4(), challenge_id=ch.id, user_id=user.id, timezone=owner_tz)
         try:
-            await session.flush()  # get ch.id without commit
-
-            # Owner becomes participant #1
-            # Determine timezone for owner participant
-            rules = ch.rules_json or {}
-            scope = ((rules.get("time_window") or {}).get("scope")) or "participant_local"
-            ch_tz = ((rules.get("time_window") or {}).get("timezone"))
-            owner_tz = x_client_tz or (ch_tz if scope == "challenge_tz" and ch_tz else "UTC")
-
-            session.add(Participant(challenge_id=ch.id, user_id=user.id, timezone=owner_tz))
-
-            await session.flush()
-            # Stake for owner (if any)
-            owner_part = await session.scalar(select(Participant).where(Participant.challenge_id == ch.id, Participant.user_id == user.id))
+            await _insert_challenge_with_owner(session, ch, owner_part)
             
             # Stake (wallet -> challenge)
             stake_amt = int(ch.entry_stake_tokens or 0)
@@ -153,19 +229,20 @@ async def create_challenge(
                     await session.rollback()
                     raise HTTPException(status_code=402, detail="Insufficient wallet balance for stake")
                     
-            # Ledger STAKE (idempotent via unique partial index)
-            await ensure_stake_entry(session, ch, owner_part)
+            # Ledger STAKE: the owner row is brand new, so no existing-entry lookup; it is
+            # inserted by the commit's flush (unique partial index still guards idempotency)
+            add_stake_entry(session, ch, owner_part)
             
             # Process challenge image if provided
             if image:
                 try:
-                    data = await image.read()
+                    data = await read_upload(image, settings.max_upload_bytes)
                     mime, _, _ = analyze_image(data)  # validates JPEG/PNG and integrity
                     
                     # Store to S3 (MinIO) using existing path structure
                     ext = ext_for_mime(mime)
                     storage_key = f"ch/{ch.id}/challenge_image.{ext}"
-                    put_bytes(storage_key, data, mime)
+                    await put_bytes_async(storage_key, data, mime)
                     
                     # Update challenge with image info
                     ch.image_storage_key = storage_key
@@ -175,8 +252,8 @@ async def create_challenge(
                     raise HTTPException(status_code=400, detail=f"Invalid image: {str(e)}")
             
             await session.commit()
-            await session.refresh(ch)
-            return await hydrate_public(session, ch, user.id)
+            # Freshly created: owner is the only participant, so no count/membership queries needed
+            return hydrate_from_row(ch, 1, True, user.id, datetime.now(dt_tz.utc))
         except IntegrityError:
             await session.rollback()
             continue
@@ -184,45 +261,70 @@ async def create_challenge(
 
 @router.get("/mine", response_model=list[ChallengePublic])
 async def list_my_challenges(session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
-    q = select(Challenge).where(Challenge.owner_id == user.id).order_by(Challenge.created_at.desc())
-    rows = (await session.execute(q)).scalars().all()
-    return [await hydrate_public(session, c, user.id) for c in rows]
+    # Everything hydrate_from_row needs is on the row: count is a column and the owner is
+    # always participant #1. raiseload guards against a future relationship lazy-loading per row.
+    stmt = (
+        select(Challenge)
+        .options(raiseload("*"))
+        .where(Challenge.owner_id == user.id)
+        .order_by(Challenge.created_at.desc())
+    )
+    rows = (await session.execute(stmt)).scalars().all()
+    now = datetime.now(dt_tz.utc)
+    return [hydrate_from_row(c, c.participant_count, True, user.id, now) for c in rows]
 
 @router.get("/joined", response_model=list[ChallengePublic])
 async def list_joined(session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
-    q = (
+    stmt = (
         select(Challenge)
+        .options(raiseload("*"))
         .join(Participant, Participant.challenge_id == Challenge.id)
         .where(Participant.user_id == user.id)
         .order_by(Challenge.created_at.desc())
     )
-    rows = (await session.execute(q)).scalars().all()
-    return [await hydrate_public(session, c, user.id) for c in rows]
+    rows = (await session.execute(stmt)).scalars().all()
+    now = datetime.now(dt_tz.utc)
+    # Joined via Participant, so the viewer is a participant of every row
+    return [hydrate_from_row(c, c.participant_count, True, user.id, now) for c in rows]
 
 @router.get("/{challenge_id}", response_model=ChallengePublic)
 async def get_challenge(challenge_id: str, session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
-    ch = await session.get(Challenge, challenge_id)
-    if not ch:
+    cid = as_challenge_id(challenge_id)
+    if cid is None:
+        raise HTTPException(status_code=404, detail="Challenge not found")
+    # The row and the viewer's membership in one SELECT (count is a column)
+    row = (await session.execute(
+        select(Challenge, is_participant_of(user.id)).where(Challenge.id == cid)
+    )).one_or_none()
+    if row is None:
         raise HTTPException(status_code=404, detail="Challenge not found")
-    return await hydrate_public(session, ch, user.id)
+    ch, is_participant = row
+    return hydrate_from_row(ch, ch.participant_count, is_participant, user.id, datetime.now(dt_tz.utc))
 
 @router.get("/{challenge_id}/participants", response_model=list[ParticipantWithUser])
 async def list_participants(challenge_id: str, session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
-    ch = await session.get(Challenge, challenge_id)
-    if not ch:
+    try:
+        cid = uuid.UUID(challenge_id)
+    except ValueError:
         raise HTTPException(status_code=404, detail="Challenge not found")
     # (Optional: owners-only restriction; for MVP we allow any participant to view)
-    q = (
+    # Outer join from Challenge: no rows -> 404, one all-NULL participant row -> empty list
+    stmt = (
         select(Participant.id, User.id, User.username, Participant.joined_at)
-        .join(User, User.id == Participant.user_id)
-        .where(Participant.challenge_id == ch.id)
+        .select_from(Challenge)
+        .outerjoin(Participant, Participant.challenge_id == Challenge.id)
+        .outerjoin(User, User.id == Participant.user_id)
+        .where(Challenge.id == cid)
         .order_by(Participant.joined_at.asc())
     )
-    rows = (await session.execute(q)).all()
+    rows = (await session.execute(stmt)).all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="Challenge not found")
+    # Typed columns straight from the DB: construct without per-row validation
     return [
-        ParticipantWithUser(
+        ParticipantWithUser.model_construct(
             participant_id=pid, user_id=uid, username=uname, joined_at=joined_at
-        ) for (pid, uid, uname, joined_at) in rows
+        ) for (pid, uid, uname, joined_at) in rows if pid is not None
     ]
 
 @router.post("/{invite_code}/join", response_model=ParticipantPublic, status_code=201)
@@ -233,14 +335,20 @@ async def join_by_code(
     x_client_tz: str | None = Header(default=None, alias="X-Client-Timezone"),
     body: dict | None = Body(default=None),
 ):
-    ch = await session.scalar(select(Challenge).where(Challenge.invite_code == invite_code))
-    if not ch:
+    # Challenge and the caller's existing membership (if any) in one round-trip
+    row = (await session.execute(
+        select(Challenge, Participant)
+        .outerjoin(Participant, and_(Participant.challenge_id == Challenge.id, Participant.user_id == user.id))
+        .where(Challenge.invite_code == invite_code)
+    )).one_or_none()
+    if row is None:
         raise HTTPException(status_code=404, detail="Invalid invite code")
+    ch, existing = row
     if user.id == ch.owner_id:
         raise HTTPException(status_code=409, detail="Owner is already part of this challenge")
     
     # NEW: Visibility enforcement
-    rules = RulesDSL.model_validate(ch.rules_json)
+    rules = challenge_rules(ch)
     
     if ch.visibility == "unlisted":
         raise HTTPException(
@@ -276,20 +384,15 @@ async def join_by_code(
     tz = x_client_tz or (body or {}).get("timezone")
     
     # Default: if DSL is challenge_tz, use that; else use UTC as ultra-fallback
-    rules = ch.rules_json or {}
-    scope = ((rules.get("time_window") or {}).get("scope")) or "participant_local"
-    ch_tz = ((rules.get("time_window") or {}).get("timezone"))
     if not tz:
-        tz = ch_tz if scope == "challenge_tz" and ch_tz else "UTC"
+        tz = ch.default_participant_tz
 
     # Prevent duplicate membership
-    existing = await session.scalar(select(Participant).where(Participant.challenge_id == ch.id, Participant.user_id == user.id))
     if existing:
         # Optional: update timezone if provided (allow timezone updates)
         if tz:
             existing.timezone = tz
-            await session.commit()
-            await session.refresh(existing)
+            await session.commit()  # expire_on_commit=False: loaded fields stay valid, no refresh
         return ParticipantPublic(
             id=existing.id, 
             challenge_id=existing.challenge_id, 
@@ -302,6 +405,12 @@ async def join_by_code(
     p = Participant(challenge_id=ch.id, user_id=user.id, timezone=tz)
     session.add(p)
     await session.flush()
+    await session.execute(
+        update(Challenge)
+        .where(Challenge.id == ch.id)
+        .values(participant_count=Challenge.participant_count + 1)
+        .execution_options(synchronize_session=False)
+    )
     
     # Stake (wallet -> challenge)
     stake_amt = int(ch.entry_stake_tokens or 0)
@@ -318,10 +427,10 @@ async def join_by_code(
             await session.rollback()
             raise HTTPException(status_code=402, detail="Insufficient wallet balance for stake")
             
-    # Ledger STAKE (idempotent via unique partial index)
-    await ensure_stake_entry(session, ch, p)
+    # Ledger STAKE for the participant created above (no existing-entry lookup needed)
+    add_stake_entry(session, ch, p)
     await session.commit()
-    await session.refresh(p)
+    # id/joined_at were filled at flush (INSERT ... RETURNING), so no refresh is needed
     return ParticipantPublic(
         id=p.id,
         challenge_id=p.challenge_id, 
@@ -341,32 +450,46 @@ async def get_watermark_code(
     Generate a watermark code for the mobile app to embed in photos.
     The code is deterministic based on (challenge_id, participant_id, slot_key).
     """
-    ch = await session.get(Challenge, challenge_id)
-    if not ch:
+    cid = as_challenge_id(challenge_id)
+    if cid is None:
         raise HTTPException(status_code=404, detail="Challenge not found")
 
-    # Must be a participant
-    participant = await session.scalar(
-        select(Participant).where(Participant.challenge_id == ch.id, Participant.user_id == user.id)
-    )
-    if not participant:
-        raise HTTPException(status_code=403, detail="Not a participant")
-
-    # Generate the code
-    code = overlay_code(str(ch.id), str(participant.id), slot_key)
+    # Must be a participant (clients poll this, so the membership is memoized briefly)
+    participant_id = _watermark_participants.get((cid, user.id))
+    if participant_id is None:
+        participant_id = await session.scalar(
+            select(Participant.id).where(Participant.challenge_id == cid, Participant.user_id == user.id)
+        )
+        if participant_id is None:
+            if not await session.scalar(select(exists().where(Challenge.id == cid))):
+                raise HTTPException(status_code=404, detail="Challenge not found")
+            raise HTTPException(status_code=403, detail="Not a participant")
+        _watermark_participants.set((cid, user.id), participant_id)
+
+    # Generate the code (overlay_code is itself memoized)
+    code = overlay_code(str(cid), str(participant_id), slot_key)
     
     return {
         "challenge_id": challenge_id,
-        "participant_id": str(participant.id),
+        "participant_id": str(participant_id),
         "slot_key": slot_key,
         "code": code,
         "watermark_text": f"CHALLY_{code}",
-        "full_string": f"CHALLY_WATERMARK:CHALLY_{code}:SUBMISSION:{challenge_id}:{participant.id}:{slot_key}",
+        "full_string": f"CHALLY_WATERMARK:CHALLY_{code}:SUBMISSION:{challenge_id}:{participant_id}:{slot_key}",
     }
 
 
+# Columns _to_submission_public reads (list queries skip the per-photo arrays and phash_bits)
+_SUBMISSION_PUBLIC_COLUMNS = (
+    Submission.id, Submission.challenge_id, Submission.participant_id, Submission.slot_key,
+    Submission.window_start_utc, Submission.window_end_utc, Submission.submitted_at,
+    Submission.proof_type, Submission.status, Submission.text_content, Submission.storage_key,
+    Submission.mime_type, Submission.meta_json, Submission.photos_uploaded,
+    Submission.photos_required, Submission.last_photo_uploaded_at,
+)
+
 def _to_submission_public(s: Submission) -> SubmissionPublic:
-    media = f"/challenges/{s.challenge_id}/submissions/{s.id}/image" if s.storage_key else None
+    media = media_url(s.storage_key, f"/challenges/{s.challenge_id}/submissions/{s.id}/image")
     return SubmissionPublic(
         id=s.id,
         challenge_id=s.challenge_id,
@@ -386,10 +509,18 @@ def _to_submission_public(s: Submission) -> SubmissionPublic:
         last_photo_uploaded_at=s.last_photo_uploaded_at,
     )
 
+def _enqueue_verification(submission_id: str) -> None:
+    try:
+        rq_queue.enqueue(verify_submission, submission_id, job_timeout=60)
+    except Exception:
+        # Non-fatal in dev; submission stays completed (will be verified later)
+        pass
+
 # --- NEW: submit proof ---
 @router.post("/{challenge_id}/submit", response_model=SubmissionPublic, status_code=201)
 async def submit_proof(
     challenge_id: str,
+    background: BackgroundTasks,
     proof_type: str = Query(..., description="one of allowed rules proof_types"),
     text: str | None = Query(default=None, description="text content when proof_type='text'"),
     overlay_code: str | None = Query(default=None, description="typed overlay code if required"),
@@ -408,14 +539,14 @@ async def submit_proof(
     if ch.status not in ("active",) or runtime not in ("started",):
         raise HTTPException(status_code=400, detail=f"Submissions closed (status={ch.status}, runtime={runtime})")
 
-    # Participant check
-    participant = await session.scalar(
-        select(Participant).where(Participant.challenge_id == ch.id, Participant.user_id == user.id)
-    )
+    # Participant check (only id/timezone are needed: a plain row, no ORM instance)
+    participant = (await session.execute(
+        select(Participant.id, Participant.timezone).where(Participant.challenge_id == ch.id, Participant.user_id == user.id)
+    )).first()
     if not participant:
         raise HTTPException(status_code=403, detail="You are not a participant of this challenge")
 
-    rules = RulesDSL.model_validate(ch.rules_json)
+    rules = challenge_rules(ch)
     if proof_type not in rules.proof_types:
         raise HTTPException(status_code=400, detail="Proof type not allowed for this challenge")
 
@@ -542,8 +673,14 @@ async def submit_proof(
     else:
         if not file:
             raise HTTPException(status_code=400, detail="Missing image file")
-        data = await file.read()
-        mime, phash_hex, exif = analyze_image(data)  # validates JPEG/PNG and integrity
+        try:
+            data = await read_upload(file, settings.max_upload_bytes)
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        try:
+            mime, phash_hex, exif = analyze_image(data)  # validates JPEG/PNG and integrity
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid image: {e}")
         mime_type = mime
         meta = {"phash": phash_hex, "exif": exif or {}}
         
@@ -551,7 +688,7 @@ async def submit_proof(
         # Watermarking will be done by worker job
         ext = ext_for_mime(mime)
         storage_key = f"ch/{ch.id}/p/{participant.id}/{slot_key}/{uuid.uuid4().hex}.{ext}"
-        put_bytes(storage_key, data, mime_type)
+        await put_bytes_async(storage_key, data, mime_type)
 
     # record typed overlay (if any)
     if overlay_code:
@@ -581,6 +718,7 @@ async def submit_proof(
             phash_history.append(meta["phash"])
             existing_meta["phash_history"] = phash_history
             existing_meta["phash"] = meta["phash"]  # Update to latest
+            pending_submission.phash_bits = phash_to_bits(meta["phash"])
         if overlay_code:
             existing_meta["overlay_typed"] = overlay_code.strip().upper()
         pending_submission.meta_json = existing_meta
@@ -589,8 +727,7 @@ async def submit_proof(
         if pending_submission.photos_uploaded >= photos_required:
             pending_submission.status = "completed"
         
-        await session.commit()
-        await session.refresh(pending_submission)
+        await session.commit()  # expire_on_commit=False: no refresh needed for the response
         sub = pending_submission
     else:
         # Create new submission
@@ -613,18 +750,26 @@ async def submit_proof(
             photos_required=photos_required,
             last_photo_uploaded_at=now if storage_key else None,
             meta_json=meta,
+            phash_bits=phash_to_bits(meta.get("phash")),
         )
         session.add(sub)
-        await session.commit()
-        await session.refresh(sub)
+        try:
+            await session.commit()
+        except IntegrityError:
+            # Lost a race with a concurrent submit for the same slot sequence
+            await session.rollback()
+            if storage_key:
+                # No row references the object uploaded above; don't leave it in the bucket
+                try:
+                    await delete_object_async(storage_key)
+                except Exception as e:
+                    log.warning("orphan_upload_delete_failed", storage_key=storage_key, error=str(e))
+            raise HTTPException(status_code=409, detail="Another submission for this slot was just recorded; please retry")
 
-    # Enqueue verification only if submission is completed
+    # Enqueue verification only if submission is completed; runs (in the threadpool) after the
+    # response is sent, so the client doesn't wait on the Redis round-trip
     if sub.status == "completed":
-        try:
-            q.enqueue(verify_submission, str(sub.id), job_timeout=60)
-        except Exception:
-            # Non-fatal in dev; submission stays completed (will be verified later)
-            pass
+        background.add_task(_enqueue_verification, str(sub.id))
 
     return _to_submission_public(sub)
 
@@ -634,6 +779,9 @@ async def list_submissions(
     challenge_id: str,
     mine: int = Query(default=0, ge=0, le=1),
     day: str | None = Query(default=None, description="YYYY-MM-DD or 'today'"),
+    limit: int = Query(default=50, ge=1, le=200),
+    before: datetime | None = Query(default=None, description="last item's submitted_at from the previous page"),
+    before_id: uuid.UUID | None = Query(default=None, description="last item's id from the previous page (tiebreak for equal submitted_at)"),
     session: AsyncSession = Depends(get_session),
     user=Depends(get_current_user),
 ):
@@ -643,32 +791,41 @@ async def list_submissions(
 
     # Must be participant to view; owners can view all
     viewer_is_owner = (ch.owner_id == user.id)
-    part = await session.scalar(select(Participant).where(Participant.challenge_id == ch.id, Participant.user_id == user.id))
+    part = (await session.execute(
+        select(Participant.id, Participant.timezone).where(Participant.challenge_id == ch.id, Participant.user_id == user.id)
+    )).first()
     if not (viewer_is_owner or part):
         raise HTTPException(status_code=403, detail="Not a participant")
 
-    q = select(Submission).where(Submission.challenge_id == ch.id)
+    stmt = select(Submission).options(load_only(*_SUBMISSION_PUBLIC_COLUMNS), raiseload("*")).where(Submission.challenge_id == ch.id)
 
     # Filter mine if requested
     if mine == 1:
         if not part:
             raise HTTPException(status_code=400, detail="You are not a participant")
-        q = q.where(Submission.participant_id == part.id)
+        stmt = stmt.where(Submission.participant_id == part.id)
 
     # Optional day filter by slot_key
     if day:
         if day == "today":
             # Resolve today's slot key for the viewer (use viewer's tz for anchor)
-            rules = RulesDSL.model_validate(ch.rules_json)
+            rules = challenge_rules(ch)
             scope = rules.time_window.scope or "participant_local"
             tz_name = (part.timezone if part else "UTC") if scope == "participant_local" else (rules.time_window.timezone or "UTC")
-            local_today = datetime.now(dt_tz.utc).astimezone(ZoneInfo(tz_name)).date().isoformat()
-            q = q.where(Submission.slot_key == local_today)
+            today_key = local_today(datetime.now(dt_tz.utc), tz_name)
+            stmt = stmt.where(Submission.slot_key == today_key)
         else:
-            q = q.where(Submission.slot_key == day)
+            stmt = stmt.where(Submission.slot_key == day)
 
-    q = q.order_by(Submission.submitted_at.desc())
-    rows = (await session.execute(q)).scalars().all()
+    # Keyset pagination: pass the last item's (submitted_at, id) as (before, before_id) for the next page.
+    # id breaks submitted_at ties so rows sharing the boundary timestamp are not skipped.
+    if before is not None:
+        if before_id is not None:
+            stmt = stmt.where(tuple_(Submission.submitted_at, Submission.id) < (before, before_id))
+        else:
+            stmt = stmt.where(Submission.submitted_at < before)
+    stmt = stmt.order_by(Submission.submitted_at.desc(), Submission.id.desc()).limit(limit)
+    rows = (await session.execute(stmt)).scalars().all()
     return [_to_submission_public(s) for s in rows]
 
 # --- NEW: leaderboard ---
@@ -684,51 +841,40 @@ async def leaderboard(
         raise HTTPException(status_code=404, detail="Challenge not found")
 
     # Any participant can view
-    viewer_part = await session.scalar(select(Participant).where(Participant.challenge_id == ch.id, Participant.user_id == user.id))
-    if not (viewer_part or user.id == ch.owner_id):
+    if user.id != ch.owner_id and not await session.scalar(_STMT_PARTICIPANT_EXISTS, {"cid": ch.id, "uid": user.id}):
         raise HTTPException(status_code=403, detail="Not a participant")
 
-    # Count accepted-ish submissions per user
-    base = (
-        select(User.id, User.username, func.count(Submission.id))
-        .join(Participant, Participant.user_id == User.id)
-        .join(Submission, Submission.participant_id == Participant.id)
-        .where(Participant.challenge_id == ch.id)
-        .where(Submission.status.in_(("accepted", "flagged", "pending")))
-        .group_by(User.id, User.username)
-    )
-
+    now = datetime.now(dt_tz.utc)  # one clock read for the week bounds and the "today" keys
+    rules = challenge_rules(ch)
+    # "Today" slot key: a single date for challenge-local windows, else each participant's own
+    # local date, computed in SQL so the flag comes back on the same row as the total
+    if (rules.time_window.scope or "participant_local") == "participant_local":
+        today_key = func.to_char(func.timezone(Participant.timezone, literal(now, DateTime(timezone=True))), "YYYY-MM-DD")
+    else:
+        today_key = literal(local_today(now, rules.time_window.timezone or "UTC"))
+    # One pass over the participants' submissions: the total counts accepted-ish rows (in this
+    # week for current_week) while the "today" flag looks at every submission in today's slot
+    counted = Submission.status.in_(("accepted", "flagged", "pending"))
     if period == "current_week":
         # Use UTC week bounds for simplicity (good enough for M3)
-        now = datetime.now(dt_tz.utc)
         monday = now - timedelta(days=now.weekday())
         monday_utc = datetime(monday.year, monday.month, monday.day, tzinfo=dt_tz.utc)
         next_monday_utc = monday_utc + timedelta(days=7)
-        base = base.where(Submission.submitted_at >= monday_utc, Submission.submitted_at < next_monday_utc)
-
-    rows = (await session.execute(base.order_by(func.count(Submission.id).desc()))).all()
-
-    # submitted_today flag per user
-    today_counts = {}
-    now = datetime.now(dt_tz.utc)
-    # Check today existence by slot_key == viewer's "today" to keep semantics simple
-    rules = RulesDSL.model_validate(ch.rules_json)
-    scope = rules.time_window.scope or "participant_local"
-    # We'll compute using each participant's own timezone by joining again (cheap enough)
-    for (uid, uname, total) in rows:
-        p = await session.scalar(select(Participant).where(Participant.challenge_id == ch.id, Participant.user_id == uid))
-        tz_name = p.timezone if p else "UTC"
-        local_today = now.astimezone(ZoneInfo(tz_name if scope == "participant_local" else (rules.time_window.timezone or "UTC"))).date().isoformat()
-        exists_today = await session.scalar(
-            select(func.count(Submission.id))
-            .join(Participant, Participant.id == Submission.participant_id)
-            .where(Participant.user_id == uid, Participant.challenge_id == ch.id, Submission.slot_key == local_today)
-        )
-        today_counts[uid] = (exists_today or 0) > 0
+        counted = and_(counted, Submission.submitted_at >= monday_utc, Submission.submitted_at < next_monday_utc)
+    total = func.count(Submission.id).filter(counted)
+    base = (
+        select(User.id, User.username, total, func.bool_or(Submission.slot_key == today_key))
+        .join(Participant, Participant.user_id == User.id)
+        .join(Submission, Submission.participant_id == Participant.id)
+        .where(Participant.challenge_id == ch.id)
+        .group_by(User.id, User.username, Participant.id, Participant.timezone)
+        .having(total > 0)
+    )
 
+    rows = (await session.execute(base.order_by(total.desc()))).all()
     return [
-        LeaderboardRow(user_id=uid, username=uname, total=int(total), submitted_today=bool(today_counts.get(uid, False)))
-        for (uid, uname, total) in rows
+        LeaderboardRow(user_id=uid, username=uname, total=int(n), submitted_today=bool(today))
+        for (uid, uname, n, today) in rows
     ]
 
 @router.get("/{challenge_id}/submissions/{submission_id}/image")
@@ -740,28 +886,30 @@ async def get_submission_image(
 ):
     """Retrieve the uploaded image for a submission."""
     # Check if user is a participant in the challenge
-    participant = await session.scalar(
-        select(Participant).where(Participant.challenge_id == challenge_id, Participant.user_id == user.id)
-    )
-    if not participant:
+    cid = as_challenge_id(challenge_id)
+    if cid is None or not await session.scalar(_STMT_PARTICIPANT_EXISTS, {"cid": cid, "uid": user.id}):
         raise HTTPException(status_code=403, detail="You are not a participant of this challenge")
     
     # Get the submission
-    submission = await session.scalar(
-        select(Submission).where(Submission.id == submission_id, Submission.challenge_id == challenge_id)
-    )
+    submission = (await session.execute(
+        select(Submission.storage_key).where(Submission.id == submission_id, Submission.challenge_id == cid)
+    )).first()
     if not submission:
         raise HTTPException(status_code=404, detail="Submission not found")
     
     if not submission.storage_key:
         raise HTTPException(status_code=404, detail="No image associated with this submission")
     
+    if settings.s3_presign_downloads:
+        # Access is checked above; the bytes themselves come straight from object storage
+        return RedirectResponse(presign_get_cached(submission.storage_key), status_code=307)
     try:
-        data, content_type = get_bytes(submission.storage_key)
-        from fastapi.responses import Response
-        return Response(content=data, media_type=content_type)
+        chunks, content_type = await open_object_async(submission.storage_key)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Image file not found in storage")
+    # Relay the object in 64 KB chunks (Starlette iterates the sync body in its threadpool).
+    # A submission's image never changes, so the viewer's browser can keep it for a while.
+    return StreamingResponse(chunks, media_type=content_type, headers={"Cache-Control": "private, max-age=300"})
 
 @router.get("/{challenge_id}/image")
 async def get_challenge_image(
@@ -779,10 +927,12 @@ async def get_challenge_image(
     if not challenge.image_storage_key:
         raise HTTPException(status_code=404, detail="No image associated with this challenge")
     
+    if settings.s3_presign_downloads:
+        return RedirectResponse(presign_get_cached(challenge.image_storage_key), status_code=307)
     try:
-        data, content_type = get_bytes(challenge.image_storage_key)
-        from fastapi.responses import Response
-        return Response(content=data, media_type=content_type)
+        chunks, content_type = await open_object_async(challenge.image_storage_key)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Image file not found in storage")
+    # Streamed like submission images; the cover is only ever set at creation, so it can be cached longer.
+    return StreamingResponse(chunks, media_type=content_type, headers={"Cache-Control": "private, max-age=3600"})
 
@@ -1,23 +1,32 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import load_only, raiseload
 from datetime import datetime, timezone as dt_tz
-from zoneinfo import ZoneInfo
 
 from app.db import get_session
 from app.auth_deps import get_current_user
 from app.models.challenge import Challenge, Participant
 from app.models.submission import Submission
 from app.schemas.submission import FeedItem, SubmissionPublic
-from app.schemas.challenge import RulesDSL
+from app.services.rules import challenge_rules
+from app.services.time_windows import local_today
 from app.config import settings
-from app.services.storage import presign_get
+from app.services.storage import media_url
 
 router = APIRouter(prefix="/feed", tags=["feed"])
 
+# Columns _to_submission_public reads; the feed query skips the rest
+_PUB_COLUMNS = (
+    Submission.id, Submission.challenge_id, Submission.participant_id, Submission.slot_key,
+    Submission.window_start_utc, Submission.window_end_utc, Submission.submitted_at,
+    Submission.proof_type, Submission.status, Submission.text_content, Submission.storage_key,
+    Submission.mime_type, Submission.meta_json,
+)
+
 def _to_submission_public(s: Submission) -> SubmissionPublic:
-    media = f"/challenges/{s.challenge_id}/submissions/{s.id}/image" if s.storage_key else None
+    media = media_url(s.storage_key, f"/challenges/{s.challenge_id}/submissions/{s.id}/image")
     return SubmissionPublic(
         id=s.id,
         challenge_id=s.challenge_id,
@@ -35,28 +44,41 @@ def _to_submission_public(s: Submission) -> SubmissionPublic:
     )
 
 @router.get("/today", response_model=list[FeedItem])
-async def my_today_feed(session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
-    # All challenges I joined (incl. ones I own because owner auto-joins)
-    parts = (await session.execute(select(Participant).where(Participant.user_id == user.id))).scalars().all()
-    if not parts:
+async def my_today_feed(response: Response, session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
+    # Lets the client (not shared caches: the feed is per user) absorb refresh bursts briefly
+    response.headers["Cache-Control"] = "private, max-age=5"
+    # All challenges I joined (incl. ones I own because owner auto-joins), with the challenge row
+    rows = (await session.execute(
+        select(Participant, Challenge)
+        .options(raiseload("*"))
+        .join(Challenge, Challenge.id == Participant.challenge_id)
+        .where(Participant.user_id == user.id)
+    )).all()
+    if not rows:
         return []
 
-    out: list[FeedItem] = []
     now = datetime.now(dt_tz.utc)
-
-    for p in parts:
-        ch = await session.get(Challenge, p.challenge_id)
-        if not ch:
-            continue
-
-        rules = RulesDSL.model_validate(ch.rules_json)
+    today_by_part: dict = {}
+    for p, ch in rows:
+        rules = challenge_rules(ch)
         scope = rules.time_window.scope or "participant_local"
         tz_name = p.timezone if scope == "participant_local" else (rules.time_window.timezone or "UTC")
-        local_today = now.astimezone(ZoneInfo(tz_name)).date().isoformat()
+        today_by_part[p.id] = local_today(now, tz_name)  # memoized per zone for the local day
 
-        my_sub = await session.scalar(
-            select(Submission).where(Submission.participant_id == p.id, Submission.slot_key == local_today)
-        )
+    # Today's submissions for every membership in one query; first one per slot wins
+    subs = (await session.execute(
+        select(Submission)
+        .options(load_only(*_PUB_COLUMNS), raiseload("*"))
+        .where(tuple_(Submission.participant_id, Submission.slot_key).in_(list(today_by_part.items())))
+        .order_by(Submission.submitted_at.asc())
+    )).scalars().all()
+    sub_by_part: dict = {}
+    for s in subs:
+        sub_by_part.setdefault(s.participant_id, s)
+
+    out: list[FeedItem] = []
+    for p, ch in rows:
+        my_sub = sub_by_part.get(p.id)
         out.append(
             FeedItem(
                 challenge_id=ch.id,
@@ -66,4 +88,4 @@ async def my_today_feed(session: AsyncSession = Depends(get_session), user=Depen
             )
         )
 
-    return out
\ No newline at end of file
+    return out
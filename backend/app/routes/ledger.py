@@ -2,14 +2,14 @@ from __future__ import annotations
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query, Path
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
 
 from app.db import get_session
 from app.auth_deps import get_current_user
-from app.models.challenge import Challenge, Participant
-from app.schemas.ledger import LedgerSnapshot
+from app.models.challenge import Challenge
+from app.schemas.ledger import LedgerSnapshot, PlatformLedger
 from app.services.ledger import snapshot_for_challenge, close_and_payout, get_platform_revenue_stats
-from app.schemas.challenge import RulesDSL
+from app.services.membership import is_participant
 
 router = APIRouter(tags=["ledger"])
 
@@ -23,8 +23,7 @@ async def get_ledger(
     if not ch:
         raise HTTPException(status_code=404, detail="Challenge not found")
     # must be a participant (owner auto-joins in your flow)
-    part = await session.scalar(select(Participant).where(Participant.challenge_id == ch.id, Participant.user_id == user.id))
-    if not part:
+    if not await is_participant(session, ch.id, user.id):
         raise HTTPException(status_code=403, detail="Not a participant of this challenge")
     snap = await snapshot_for_challenge(session, ch.id, user.id)
     return {"challenge_id": ch.id, **snap}
@@ -38,17 +37,17 @@ async def end_and_payout(
     from app.db import engine
     from sqlalchemy.ext.asyncio import async_sessionmaker
     
-    # Create a fresh session with SERIALIZABLE isolation for challenge closure
+    # Dedicated session so the closure commits on its own, independent of the request session
     async_session = async_sessionmaker(engine, expire_on_commit=False)
     async with async_session() as session:
-        # Set SERIALIZABLE isolation at the very start of transaction
-        await session.execute(text("SET TRANSACTION ISOLATION LEVEL SERIALIZABLE"))
-        
-        # Acquire advisory lock for this challenge
+        # Closures of one challenge are serialized by this transaction-scoped advisory lock:
+        # only holders of the key close the challenge and write its PAYOUT/PLATFORM_REVENUE
+        # entries, so a second caller waits here and then sees the first one's committed
+        # result (close_and_payout is a no-op once ended). Plain READ COMMITTED is enough:
+        # no SERIALIZABLE retries, and no FOR UPDATE holding the challenge row meanwhile.
         await session.execute(text("SELECT pg_advisory_xact_lock(hashtext(:cid))"), {"cid": str(challenge_id)})
-        
-        # Lock the challenge row for update
-        ch = await session.get(Challenge, challenge_id, with_for_update=True)
+
+        ch = await session.get(Challenge, challenge_id)
         if not ch:
             raise HTTPException(status_code=404, detail="Challenge not found")
         if ch.owner_id != user.id:
@@ -75,7 +74,7 @@ async def get_platform_revenue(
     return stats
 
 
-@router.get("/platform/ledger")
+@router.get("/platform/ledger", response_model=PlatformLedger)
 async def get_platform_ledger(
     days: int = Query(default=30, ge=1, le=365, description="Number of days to look back"),
     limit: int = Query(default=50, ge=1, le=500, description="Maximum number of entries to return"),
@@ -91,14 +90,18 @@ async def get_platform_ledger(
     from uuid import UUID
     from app.models.ledger import Ledger
     from app.models.challenge import Challenge
-    from app.schemas.ledger import LedgerEntryPublic
     
     cutoff = datetime.now(dt_tz.utc) - timedelta(days=days)
     platform_id = UUID("00000000-0000-0000-0000-000000000000")
     
-    # Get all platform revenue entries with challenge details
-    entries = (await session.execute(
-        select(Ledger, Challenge.name.label("challenge_name"))
+    # Platform revenue entries with challenge names, as plain columns (no Ledger objects).
+    # The window sum runs before LIMIT, so it totals the whole period in the same round trip.
+    rows = (await session.execute(
+        select(
+            Ledger.id, Ledger.challenge_id, Challenge.name.label("challenge_name"),
+            Ledger.type, Ledger.amount, Ledger.note, Ledger.created_at,
+            func.sum(Ledger.amount).over().label("period_total"),
+        )
         .join(Challenge, Ledger.challenge_id == Challenge.id)
         .where(
             Ledger.participant_id == platform_id,
@@ -108,23 +111,20 @@ async def get_platform_ledger(
         .order_by(Ledger.created_at.desc())
         .limit(limit)
     )).all()
-    
-    # Calculate totals
-    total_revenue = sum(int(entry.Ledger.amount) for entry in entries)
-    
+
     return {
         "period_days": days,
-        "total_entries": len(entries),
-        "total_revenue_tokens": total_revenue,
+        "total_entries": len(rows),
+        "total_revenue_tokens": int(rows[0].period_total) if rows else 0,
         "entries": [
             {
-                "id": str(entry.Ledger.id),
-                "challenge_id": str(entry.Ledger.challenge_id),
-                "challenge_name": entry.challenge_name,
-                "type": entry.Ledger.type,
-                "amount": int(entry.Ledger.amount),
-                "note": entry.Ledger.note,
-                "created_at": entry.Ledger.created_at,
-            } for entry in entries
+                "id": str(r.id),
+                "challenge_id": str(r.challenge_id),
+                "challenge_name": r.challenge_name,
+                "type": r.type,
+                "amount": int(r.amount),
+                "note": r.note,
+                "created_at": r.created_at,
+            } for r in rows
         ]
     }
\ No newline at end of file
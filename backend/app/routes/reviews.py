@@ -2,8 +2,9 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException, Query, Path
 from typing import Literal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import select, func, and_, exists
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import load_only, raiseload
 from uuid import UUID
 from math import ceil
 from datetime import datetime, timezone as dt_tz, timedelta
@@ -13,17 +14,27 @@ from app.auth_deps import get_current_user
 from app.models.challenge import Challenge, Participant
 from app.models.submission import Submission
 from app.models.review import Vote
-from app.schemas.challenge import RulesDSL
-from app.schemas.review import VoteCreate
+from app.services.rules import challenge_rules
+from app.schemas.review import VoteCreate, ReviewStats
 from app.schemas.submission import SubmissionPublic
 from app.services.ledger import create_penalty_once
+from app.services.membership import is_participant
+from app.services.storage import media_url
 
 router = APIRouter(prefix="/reviews", tags=["reviews"])
 
 StatusFilter = Literal["pending", "accepted", "rejected", "all"]
 
+# Columns _pub reads; list queries skip the rest (storage_keys/mime_types arrays, phash, ...)
+_PUB_COLUMNS = (
+    Submission.id, Submission.challenge_id, Submission.participant_id, Submission.slot_key,
+    Submission.window_start_utc, Submission.window_end_utc, Submission.submitted_at,
+    Submission.proof_type, Submission.status, Submission.text_content, Submission.storage_key,
+    Submission.mime_type, Submission.meta_json,
+)
+
 def _pub(ch_id, s: Submission) -> SubmissionPublic:
-    media = f"/challenges/{ch_id}/submissions/{s.id}/image" if s.storage_key else None
+    media = media_url(s.storage_key, f"/challenges/{ch_id}/submissions/{s.id}/image")
     return SubmissionPublic(
         id=s.id,
         challenge_id=s.challenge_id,
@@ -48,20 +59,19 @@ async def _list_for_user(
     mine: int,
     limit: int,
 ):
-    # All challenges where user participates
-    parts = (await session.execute(select(Participant).where(Participant.user_id == user.id))).scalars().all()
-    if not parts:
-        return []
-    part_by_ch = {p.challenge_id: p for p in parts}
-    my_part_ids = [p.id for p in parts]
-    ch_ids = list(part_by_ch.keys())
-
-    q = select(Submission).where(Submission.challenge_id.in_(ch_ids))
+    # My memberships as subqueries: Postgres joins them in, no id lists round-trip through Python
+    my_part_ids = select(Participant.id).where(Participant.user_id == user.id)
 
+    # Only the columns _pub reads; raiseload: a relationship touched per row should fail loudly, not N+1
+    base = select(Submission).options(load_only(*_PUB_COLUMNS), raiseload("*"))
     if challenge_id:
-        if challenge_id not in part_by_ch:
+        if not await is_participant(session, challenge_id, user.id):
             raise HTTPException(status_code=403, detail="Not a participant in that challenge")
-        q = q.where(Submission.challenge_id == challenge_id)
+        q = base.where(Submission.challenge_id == challenge_id)
+    else:
+        q = base.where(
+            Submission.challenge_id.in_(select(Participant.challenge_id).where(Participant.user_id == user.id))
+        )
 
     if status != "all":
         q = q.where(Submission.status == status)
@@ -94,7 +104,7 @@ async def list_default(
     # Back-compat: defaults to pending queue
     return await _list_for_user(session, user, "pending", challenge_id, mine, limit)
 
-@router.get("/stats")
+@router.get("/stats", response_model=ReviewStats)
 async def review_stats(
     session: AsyncSession = Depends(get_session),
     user=Depends(get_current_user),
@@ -107,7 +117,9 @@ async def review_stats(
       - accepted_today / rejected_today: activity pulse (UTC day)
       - my_votes_today: how many votes you cast today (global)
     """
-    parts = (await session.execute(select(Participant).where(Participant.user_id == user.id))).scalars().all()
+    parts = (await session.execute(
+        select(Participant.id, Participant.challenge_id).where(Participant.user_id == user.id)
+    )).all()
     if not parts:
         return {
             "global": {"pending_to_review": 0, "mine_pending": 0, "accepted_today": 0, "rejected_today": 0, "my_votes_today": 0},
@@ -126,9 +138,6 @@ async def review_stats(
     day_start = datetime(now.year, now.month, now.day, tzinfo=dt_tz.utc)
     day_end = day_start + timedelta(days=1)
 
-    per = []
-    g_pending = g_mine_pending = g_acc = g_rej = 0
-
     # Global votes today
     my_part_ids = [p.id for p in parts]
     my_votes_today = await session.scalar(
@@ -137,47 +146,34 @@ async def review_stats(
         .where(Vote.created_at >= day_start, Vote.created_at < day_end)
     ) or 0
 
-    # Preload challenge names
-    ch_map = {c.id: c for c in (await session.execute(select(Challenge).where(Challenge.id.in_(ch_ids)))).scalars().all()}
+    # All four counters for every challenge in one grouped pass. Within a challenge my only
+    # participant is part_by_ch[cid], so "not mine" is simply NOT IN my participant ids.
+    pending = Submission.status == "pending"
+    today = and_(Submission.submitted_at >= day_start, Submission.submitted_at < day_end)
+    voted = exists().where(Vote.submission_id == Submission.id, Vote.voter_participant_id.in_(my_part_ids))
+    stmt = (
+        select(
+            Challenge.id,
+            Challenge.name,
+            func.count(Submission.id).filter(pending, Submission.participant_id.not_in(my_part_ids), ~voted),
+            func.count(Submission.id).filter(pending, Submission.participant_id.in_(my_part_ids)),
+            func.count(Submission.id).filter(Submission.status == "accepted", today),
+            func.count(Submission.id).filter(Submission.status == "rejected", today),
+        )
+        .select_from(Challenge)
+        .outerjoin(Submission, Submission.challenge_id == Challenge.id)
+        .where(Challenge.id.in_(ch_ids))
+        .group_by(Challenge.id, Challenge.name)
+    )
+    counts = {cid: tuple(rest) for (cid, *rest) in (await session.execute(stmt)).all()}
 
+    per = []
+    g_pending = g_mine_pending = g_acc = g_rej = 0
     for cid in ch_ids:
-        me_p = part_by_ch[cid]
-
-        # Subquery: ids I already voted on in this challenge
-        voted_ids_subq = select(Vote.submission_id).where(Vote.voter_participant_id == me_p.id).subquery()
-
-        pending_to_review = await session.scalar(
-            select(func.count()).select_from(Submission)
-            .where(Submission.challenge_id == cid)
-            .where(Submission.status == "pending")
-            .where(Submission.participant_id != me_p.id)
-            .where(~Submission.id.in_(voted_ids_subq))
-        ) or 0
-
-        mine_pending = await session.scalar(
-            select(func.count()).select_from(Submission)
-            .where(Submission.challenge_id == cid)
-            .where(Submission.status == "pending")
-            .where(Submission.participant_id == me_p.id)
-        ) or 0
-
-        accepted_today = await session.scalar(
-            select(func.count()).select_from(Submission)
-            .where(Submission.challenge_id == cid)
-            .where(Submission.status == "accepted")
-            .where(Submission.submitted_at >= day_start, Submission.submitted_at < day_end)
-        ) or 0
-
-        rejected_today = await session.scalar(
-            select(func.count()).select_from(Submission)
-            .where(Submission.challenge_id == cid)
-            .where(Submission.status == "rejected")
-            .where(Submission.submitted_at >= day_start, Submission.submitted_at < day_end)
-        ) or 0
-
+        name, pending_to_review, mine_pending, accepted_today, rejected_today = counts.get(cid, ("", 0, 0, 0, 0))
         per.append({
             "challenge_id": str(cid),
-            "challenge_name": ch_map.get(cid).name if cid in ch_map else "",
+            "challenge_name": name,
             "pending_to_review": int(pending_to_review),
             "mine_pending": int(mine_pending),
             "accepted_today": int(accepted_today),
@@ -213,32 +209,52 @@ async def list_with_status(
 
 @router.post("/vote")
 async def cast_vote(payload: VoteCreate, session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
-    s = await session.get(Submission, payload.submission_id)
-    if not s:
+    # Submission, its challenge and the caller's participant id (if any) in one round-trip
+    row = (await session.execute(
+        select(Submission, Challenge, Participant.id)
+        .join(Challenge, Challenge.id == Submission.challenge_id)
+        .outerjoin(Participant, and_(Participant.challenge_id == Challenge.id, Participant.user_id == user.id))
+        .where(Submission.id == payload.submission_id)
+    )).one_or_none()
+    if row is None:
         raise HTTPException(status_code=404, detail="Submission not found")
-    ch = await session.get(Challenge, s.challenge_id)
-    viewer = await session.scalar(select(Participant).where(Participant.challenge_id == ch.id, Participant.user_id == user.id))
-    if not viewer:
+    s, ch, viewer_id = row
+    if viewer_id is None:
         raise HTTPException(status_code=403, detail="Not a participant")
-    if viewer.id == s.participant_id:
+    if viewer_id == s.participant_id:
         raise HTTPException(status_code=400, detail="Cannot vote on your own submission")
     if s.status != "pending":
         raise HTTPException(status_code=400, detail="Submission not pending review")
 
-    # Vote, quorum evaluation, and penalty creation atomically
-    # Upsert-like guard (unique constraint handles race)
-    v = Vote(submission_id=s.id, voter_participant_id=viewer.id, approve=payload.approve)
-    session.add(v)
-    await session.flush()
+    # Vote, quorum evaluation, and penalty creation atomically.
+    # Check-and-insert in one statement: uq_vote_once_per_voter turns a repeat (or racing) vote
+    # into "no row returned" instead of an IntegrityError from a flush.
+    vote_id = await session.scalar(
+        pg_insert(Vote)
+        .values(submission_id=s.id, voter_participant_id=viewer_id, approve=payload.approve)
+        .on_conflict_do_nothing(index_elements=[Vote.submission_id, Vote.voter_participant_id])
+        .returning(Vote.id)
+    )
+    if vote_id is None:
+        raise HTTPException(status_code=409, detail="You already voted on this submission")
 
     # Quorum evaluation
-    rules = RulesDSL.model_validate(ch.rules_json)
+    rules = challenge_rules(ch)
     quorum_pct = max(50, min(100, rules.verification.quorum_pct))
-    # Eligible = participants minus the submitter
-    eligible_cnt = await session.scalar(
-        select(func.count()).select_from(Participant).where(Participant.challenge_id == ch.id)
+    # Participant count and vote tallies (including the vote just inserted) in one round-trip;
+    # no Vote rows loaded
+    member_cnt = (
+        select(func.count()).select_from(Participant).where(Participant.challenge_id == ch.id).scalar_subquery()
     )
-    eligible = max(0, int(eligible_cnt or 0) - 1)
+    participant_cnt, approvals, rejections = (await session.execute(
+        select(
+            member_cnt,
+            func.count().filter(Vote.approve.is_(True)),
+            func.count().filter(Vote.approve.is_(False)),
+        ).select_from(Vote).where(Vote.submission_id == s.id)
+    )).one()
+    # Eligible = participants minus the submitter
+    eligible = max(0, int(participant_cnt or 0) - 1)
 
     # If nobody else to vote, auto-accept
     if eligible <= 0:
@@ -246,13 +262,6 @@ async def cast_vote(payload: VoteCreate, session: AsyncSession = Depends(get_ses
         await session.commit()
         return {"status": s.status, "reason": "no_eligible_reviewers"}
 
-    # Count votes so far
-    votes = (await session.execute(
-        select(Vote).where(Vote.submission_id == s.id)
-    )).scalars().all()
-    approvals = sum(1 for x in votes if x.approve)
-    rejections = sum(1 for x in votes if not x.approve)
-
     needed = ceil(quorum_pct * eligible / 100.0)
 
     prev_status = s.status
@@ -1,5 +1,6 @@
 from __future__ import annotations
 import stripe
+from uuid import UUID
 from fastapi import APIRouter, Depends, Header, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import settings
@@ -8,6 +9,12 @@ from app.services.wallet import credit_deposit_idempotent
 
 router = APIRouter(tags=["stripe"])
 
+async def _credit_paid(db: AsyncSession, external_id: str, user_id: str, amount_cents: int) -> None:
+    """Credit a paid deposit once per payment_intent id; shared by both event paths."""
+    created = await credit_deposit_idempotent(db, user_id=UUID(user_id), external_id=external_id, usd_cents=amount_cents)
+    if created:
+        await db.commit()
+
 @router.post("/stripe/webhook")
 async def stripe_webhook(
     request: Request,
@@ -20,15 +27,13 @@ async def stripe_webhook(
     payload = await request.body()
     try:
         event = stripe.Webhook.construct_event(
-            payload=payload.decode("utf-8"),
+            payload=payload,  # raw bytes: the signature is over the exact body
             sig_header=stripe_signature or "",
             secret=settings.stripe_webhook_secret,
         )
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid webhook: {e}")
 
-    stripe.api_key = settings.stripe_secret_key
-
     # Handle both paths; we use payment_intent id as idempotency key.
     if event["type"] == "checkout.session.completed":
         sess = event["data"]["object"]
@@ -37,10 +42,7 @@ async def stripe_webhook(
             user_id = sess.get("client_reference_id") or (sess.get("metadata") or {}).get("user_id")
             amount_cents = int(sess.get("amount_total") or 0)
             if pi_id and user_id and amount_cents > 0:
-                from uuid import UUID
-                created = await credit_deposit_idempotent(db, user_id=UUID(user_id), external_id=pi_id, usd_cents=amount_cents)
-                if created:
-                    await db.commit()
+                await _credit_paid(db, pi_id, user_id, amount_cents)
         return {"ok": True}
 
     if event["type"] == "payment_intent.succeeded":
@@ -48,10 +50,7 @@ async def stripe_webhook(
         user_id = (pi.get("metadata") or {}).get("user_id")
         amount_cents = int(pi.get("amount_received") or pi.get("amount") or 0)
         if pi.get("status") == "succeeded" and user_id and amount_cents > 0:
-            from uuid import UUID
-            created = await credit_deposit_idempotent(db, user_id=UUID(user_id), external_id=pi["id"], usd_cents=amount_cents)
-            if created:
-                await db.commit()
+            await _credit_paid(db, pi["id"], user_id, amount_cents)
         return {"ok": True}
 
     # Ignore other events
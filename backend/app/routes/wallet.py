@@ -1,33 +1,49 @@
 from __future__ import annotations
+import asyncio
 import stripe
+import structlog
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.db import get_session
 from app.auth_deps import get_current_user
 from app.schemas.wallet import WalletSnapshot, WalletEntryPublic, CreateDepositRequest, CreateDepositResponse, WithdrawRequest, WithdrawResponse
-from app.services.wallet import wallet_balance, wallet_entries, debit_tokens, InsufficientFunds
+from app.services.wallet import (
+    wallet_entries, deposit_lots, debit_tokens, InsufficientFunds,
+    cached_wallet_snapshot, remember_wallet_snapshot,
+)
 from sqlalchemy import select, func, text
 from datetime import datetime, timezone as dt_tz, timedelta
 from app.models.wallet import WalletEntry
 import uuid
 
 router = APIRouter(prefix="/wallet", tags=["wallet"])
+log = structlog.get_logger()
+
+# Settings are fixed for the process lifetime: configure the Stripe client once, not per request
+stripe.api_key = settings.stripe_secret_key
 
 @router.get("", response_model=WalletSnapshot)
 async def get_wallet(session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
-    bals = await wallet_balance(session, user.id)
+    snap = cached_wallet_snapshot(user.id)
+    if snap is not None:
+        return snap
+    # Every entry is fetched anyway, so the balance is their sum: one round-trip, and the
+    # balance can't disagree with the list it is shown next to
     rows = await wallet_entries(session, user.id)
-    return {
-        "balance": bals,
-        "entries": [
+    snap = WalletSnapshot(
+        balance=sum(int(r.amount) for r in rows),
+        entries=[
             WalletEntryPublic(
                 id=r.id, type=r.type, amount=int(r.amount), currency=r.currency,
                 external_id=r.external_id, note=r.note, created_at=r.created_at
             ) for r in rows
-        ]
-    }
+        ],
+    )
+    remember_wallet_snapshot(user.id, snap)
+    return snap
 
 @router.post("/deposit/checkout", response_model=CreateDepositResponse)
 async def create_deposit_checkout(payload: CreateDepositRequest, session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
@@ -48,10 +64,10 @@ async def create_deposit_checkout(payload: CreateDepositRequest, session: AsyncS
 
     # 1 token = 1 cent (by default). If TOKEN_PRICE_USD_CENTS != 1, we scale.
     usd_cents = payload.tokens * max(1, settings.token_price_usd_cents)
-    stripe.api_key = settings.stripe_secret_key
 
-    # Create a one-off payment via Checkout
-    session = stripe.checkout.Session.create(
+    # Create a one-off payment via Checkout (blocking SDK call: keep it off the event loop)
+    session = await run_in_threadpool(
+        stripe.checkout.Session.create,
         mode="payment",
         client_reference_id=str(user.id),  # we'll use this in the webhook
         line_items=[{
@@ -95,58 +111,71 @@ async def withdraw_refund(payload: WithdrawRequest, session: AsyncSession = Depe
         raise HTTPException(status_code=402, detail="Insufficient wallet balance")
 
     # Build FIFO refund across deposits using allocations *remaining* per deposit
-    stripe.api_key = settings.stripe_secret_key
     tokens_left = payload.tokens
     cents_per_token = max(1, settings.token_price_usd_cents)
 
     # Deposits with remaining (unallocated) and within refund window
     window_start = datetime.now(dt_tz.utc) - timedelta(days=settings.refund_window_days)
-    deposits = (await session.execute(
-        select(WalletEntry)
-        .where(WalletEntry.user_id == user.id, WalletEntry.type == "DEPOSIT", WalletEntry.created_at >= window_start)
-        .order_by(WalletEntry.created_at.asc())
-    )).scalars().all()
+    deposits = await deposit_lots(session, user.id, since=window_start, needed=tokens_left)
 
-    refunds_made = []
+    # Plan the FIFO split first; the refunds themselves are independent of each other
+    plan: list[tuple[str, int]] = []  # (payment_intent, tokens)
     for dep in deposits:
         if tokens_left <= 0:
             break
-        used = await session.scalar(
-            select(func.coalesce(func.sum(text("tokens")), 0))
-            .select_from(text("wallet_allocations"))
-            .where(text("deposit_entry_id = :d")), {"d": str(dep.id)}
-        ) or 0
-        remaining = int(dep.amount) - int(used)
-        if remaining <= 0:
-            continue
-        take = min(remaining, tokens_left)
+        take = min(int(dep.remaining), tokens_left)
         # Stripe refund (against the deposit's payment_intent)
         if not dep.external_id:
             continue  # safety: should always be set
-        try:
-            r = stripe.Refund.create(
-                payment_intent=dep.external_id,
-                amount=int(take * cents_per_token),
-            )
-            refunds_made.append((r["id"], take))
-            # Audit row
-            await session.execute(text("""
-                INSERT INTO wallet_refunds (user_id, stripe_refund_id, amount_cents, tokens, currency, status)
-                VALUES (:u, :rid, :amt, :tok, 'usd', 'succeeded')
-            """), {"u": str(user.id), "rid": r["id"], "amt": int(take * cents_per_token), "tok": int(take)})
-            tokens_left -= take
-        except Exception as e:
-            await session.rollback()
-            raise HTTPException(status_code=500, detail=f"Stripe refund failed: {e}")
+        plan.append((dep.external_id, take))
+        tokens_left -= take
+
+    # Blocking SDK calls run side by side in the threadpool: latency is the slowest refund, not the sum
+    results = await asyncio.gather(
+        *(
+            run_in_threadpool(stripe.Refund.create, payment_intent=pi, amount=int(take * cents_per_token))
+            for pi, take in plan
+        ),
+        return_exceptions=True,
+    )
+
+    refunds_made = []
+    failed = 0
+    for (pi, take), r in zip(plan, results):
+        if isinstance(r, Exception):
+            log.error("stripe_refund_failed", user_id=str(user.id), payment_intent=pi, tokens=take, error=str(r))
+            failed += 1
+            tokens_left += take  # not sent to card: restored to the wallet below
+            continue
+        refunds_made.append((r["id"], take))
+    if failed and not refunds_made:
+        await session.rollback()
+        raise HTTPException(status_code=500, detail="Refund to card failed; your wallet was not charged")
+
+    if refunds_made:
+        # Audit rows, all in one executemany round-trip
+        await session.execute(text("""
+            INSERT INTO wallet_refunds (user_id, stripe_refund_id, amount_cents, tokens, currency, status)
+            VALUES (:u, :rid, :amt, :tok, 'usd', 'succeeded')
+        """), [
+            {"u": str(user.id), "rid": rid, "amt": int(take * cents_per_token), "tok": int(take)}
+            for rid, take in refunds_made
+        ])
 
     if tokens_left > 0:
-        # Could not refund the full amount (not enough refundable lots)
+        # Could not refund the full amount (not enough refundable lots, or some refunds failed)
         # Reverse the portion of wallet WITHDRAW we couldn't send back to card:
         # Simply add ADJUST +tokens_left to restore wallet.
-        session.add(WalletEntry(user_id=user.id, type="ADJUST", amount=int(tokens_left), currency="usd", note="refund_unavailable_restore"))
+        note = "refund_failed_restore" if failed else "refund_unavailable_restore"
+        session.add(WalletEntry(user_id=user.id, type="ADJUST", amount=int(tokens_left), currency="usd", note=note))
         tokens_refunded = payload.tokens - tokens_left
     else:
         tokens_refunded = payload.tokens
 
     await session.commit()
-    return WithdrawResponse(requested=payload.tokens, refunded=tokens_refunded, stripe_refunds=[rid for (rid, _t) in refunds_made])
\ No newline at end of file
+    return WithdrawResponse(
+        requested=payload.tokens,
+        refunded=tokens_refunded,
+        stripe_refunds=[rid for (rid, _t) in refunds_made],
+        failed_refunds=failed,
+    )
\ No newline at end of file
@@ -24,4 +24,19 @@ class LedgerSnapshot(BaseModel):
     pool_tokens: int
     your_balance: int
     totals: list[ParticipantBalance]
-    entries: list[LedgerEntryPublic]
\ No newline at end of file
+    entries: list[LedgerEntryPublic]
+
+class PlatformLedgerEntry(BaseModel):
+    id: UUID
+    challenge_id: UUID
+    challenge_name: str
+    type: str
+    amount: int
+    note: str | None = None
+    created_at: datetime
+
+class PlatformLedger(BaseModel):
+    period_days: int
+    total_entries: int
+    total_revenue_tokens: int
+    entries: list[PlatformLedgerEntry]
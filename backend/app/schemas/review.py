@@ -1,7 +1,24 @@
 from __future__ import annotations
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from uuid import UUID
 
 class VoteCreate(BaseModel):
     submission_id: UUID
-    approve: bool
\ No newline at end of file
+    approve: bool
+
+class ReviewCounts(BaseModel):
+    pending_to_review: int
+    mine_pending: int
+    accepted_today: int
+    rejected_today: int
+
+class ReviewStatsGlobal(ReviewCounts):
+    my_votes_today: int
+
+class ChallengeReviewStats(ReviewCounts):
+    challenge_id: UUID
+    challenge_name: str
+
+class ReviewStats(BaseModel):
+    global_: ReviewStatsGlobal = Field(alias="global")  # "global" is a Python keyword
+    per_challenge: list[ChallengeReviewStats]
@@ -17,7 +17,7 @@ class SubmissionPublic(BaseModel):
     text_content: str | None = None
     mime_type: str | None = None
     # 🔒 do not expose storage keys
-    media_url: str | None = None   # served via proxy endpoint
+    media_url: str | None = None   # API proxy path, or a presigned URL when S3_PRESIGN_DOWNLOADS
     meta: dict = Field(default_factory=dict)
     
     # NEW: Multi-photo progress tracking
@@ -31,4 +31,6 @@ class WithdrawRequest(BaseModel):
 class WithdrawResponse(BaseModel):
     requested: int
     refunded: int
-    stripe_refunds: list[str]
\ No newline at end of file
+    stripe_refunds: list[str]
+    # Refunds Stripe rejected; their tokens were restored to the wallet (ADJUST refund_failed_restore)
+    failed_refunds: int = 0
\ No newline at end of file
@@ -3,8 +3,10 @@ import os
 from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 import jwt
+from fastapi.concurrency import run_in_threadpool
 from passlib.context import CryptContext
 from app.config import settings
+from app.cache import TTLCache
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -13,12 +15,22 @@ JWT_ALG = "HS256"
 ACCESS_TTL_MIN = int(os.getenv("ACCESS_TTL_MIN", "15"))
 REFRESH_TTL_MIN = int(os.getenv("REFRESH_TTL_MIN", "10080"))  # 7d
 
+# Decoded claims keyed by raw token; entries never outlive the token's own exp
+_decoded_tokens = TTLCache(maxsize=4096, ttl=60)
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(password: str, password_hash: str) -> bool:
     return pwd_context.verify(password, password_hash)
 
+# bcrypt costs tens of ms of CPU per call; run it off the event loop in request handlers
+async def hash_password_async(password: str) -> str:
+    return await run_in_threadpool(hash_password, password)
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    return await run_in_threadpool(verify_password, password, password_hash)
+
 def _make_token(sub: str, ttl_min: int, token_type: str) -> str:
     now = datetime.now(timezone.utc)
     payload = {
@@ -37,3 +49,13 @@ def make_refresh_token(sub: str) -> str:
 
 def decode_token(token: str) -> dict[str, Any]:
     return jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
+
+def decode_token_cached(token: str) -> dict[str, Any]:
+    """decode_token with a short-lived cache of successful decodes (failures are never cached)."""
+    data = _decoded_tokens.get(token)
+    if data is None:
+        data = decode_token(token)
+        exp = data.get("exp")
+        ttl = exp - datetime.now(timezone.utc).timestamp() if isinstance(exp, (int, float)) else 0
+        _decoded_tokens.set(token, data, ttl)
+    return data
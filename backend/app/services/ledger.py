@@ -1,9 +1,8 @@
 from __future__ import annotations
-from typing import Iterable, Tuple
+from typing import Tuple
 from uuid import UUID
 from datetime import date, timedelta
-from zoneinfo import ZoneInfo
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, exists
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.ledger import Ledger
@@ -12,24 +11,33 @@ from app.models.submission import Submission
 from app.models.user import User
 from app.schemas.challenge import RulesDSL
 from app.services.wallet import credit_tokens
+from app.services.rules import challenge_rules
+from app.services.time_windows import zone
 
 # ---------- helpers: stakes / penalties ----------
 
-async def ensure_stake_entry(session: AsyncSession, ch: Challenge, p: Participant) -> None:
-    """Create a single STAKE entry for this participant if needed."""
+def add_stake_entry(session: AsyncSession, ch: Challenge, p: Participant) -> None:
+    """Queue the STAKE entry for a participant created in this transaction (nothing to dedupe)."""
     amt = int(ch.entry_stake_tokens or 0)
     if amt <= 0:
         return
-    exists = await session.scalar(
-        select(Ledger).where(
+    session.add(Ledger(challenge_id=ch.id, participant_id=p.id, type="STAKE", amount=-amt, note="entry_stake"))
+
+
+async def ensure_stake_entry(session: AsyncSession, ch: Challenge, p: Participant) -> None:
+    """Create a single STAKE entry for this participant if needed."""
+    if int(ch.entry_stake_tokens or 0) <= 0:
+        return
+    has_stake = await session.scalar(
+        select(exists().where(
             Ledger.challenge_id == ch.id,
             Ledger.participant_id == p.id,
             Ledger.type == "STAKE",
-        )
+        ))
     )
-    if exists:
+    if has_stake:
         return
-    session.add(Ledger(challenge_id=ch.id, participant_id=p.id, type="STAKE", amount=-amt, note="entry_stake"))
+    add_stake_entry(session, ch, p)
 
 
 async def create_penalty_once(session: AsyncSession, ch_id: UUID, participant_id: UUID, submission_id: UUID, penalty_tokens: int) -> None:
@@ -77,10 +85,10 @@ async def snapshot_for_challenge(session: AsyncSession, challenge_id: UUID, view
     pool = max(0, -total_sum)
 
     # viewer balance
-    viewer_part = await session.scalar(
-        select(Participant).where(Participant.challenge_id == challenge_id, Participant.user_id == viewer_user_id)
+    viewer_part_id = await session.scalar(
+        select(Participant.id).where(Participant.challenge_id == challenge_id, Participant.user_id == viewer_user_id)
     )
-    your_balance = balances.get(viewer_part.id, 0) if viewer_part else 0
+    your_balance = balances.get(viewer_part_id, 0) if viewer_part_id else 0
 
     # shape output
     from app.schemas.ledger import LedgerEntryPublic, ParticipantBalance
@@ -120,12 +128,11 @@ async def snapshot_for_challenge(session: AsyncSession, challenge_id: UUID, view
 def _monday_of(d: date) -> date:
     return d - timedelta(days=d.weekday())
 
-def _date_range_inclusive(a: date, b: date) -> Iterable[date]:
-    cur = a
-    step = timedelta(days=1)
-    while cur <= b:
-        yield cur
-        cur += step
+def _weekdays_inclusive(a: date, b: date) -> int:
+    """Mon-Fri days in [a, b] by integer arithmetic: 5 per full week plus the leftover days."""
+    full_weeks, rest = divmod((b - a).days + 1, 7)
+    wd = a.weekday()
+    return full_weeks * 5 + sum(1 for i in range(rest) if (wd + i) % 7 < 5)
 
 def _expected_slots_count(ch: Challenge, p: Participant, rules: RulesDSL) -> Tuple[int, str, str]:
     """
@@ -134,7 +141,7 @@ def _expected_slots_count(ch: Challenge, p: Participant, rules: RulesDSL) -> Tup
     - For weekly:          slot_key = Monday anchor YYYY-MM-DD
     """
     tz_name = p.timezone if (rules.time_window.scope or "participant_local") == "participant_local" else (rules.time_window.timezone or "UTC")
-    tz = ZoneInfo(tz_name)
+    tz = zone(tz_name)
 
     start_local = ch.starts_at.astimezone(tz).date()
     end_local = ch.ends_at.astimezone(tz).date()
@@ -149,12 +156,11 @@ def _expected_slots_count(ch: Challenge, p: Participant, rules: RulesDSL) -> Tup
         weeks = ((last - first).days // 7) + 1
         return weeks, first.isoformat(), last.isoformat()
 
-    # daily / weekdays
-    cnt = 0
-    for d in _date_range_inclusive(start_local, end_local):
-        if freq == "weekdays" and d.weekday() >= 5:
-            continue
-        cnt += 1
+    # daily / weekdays: closed form, no per-day loop over the challenge span
+    if freq == "weekdays":
+        cnt = _weekdays_inclusive(start_local, end_local)
+    else:
+        cnt = (end_local - start_local).days + 1
     return cnt, start_local.isoformat(), end_local.isoformat()
 
 
@@ -202,7 +208,7 @@ async def close_and_payout(session: AsyncSession, ch: Challenge) -> dict:
         snap = await snapshot_for_challenge(session, ch.id, ch.owner_id)
         return {"status": "already_ended", **snap}
 
-    rules = RulesDSL.model_validate(ch.rules_json)
+    rules = challenge_rules(ch)
     finishers = await determine_finishers(session, ch, rules)
 
     # Current pool
@@ -8,18 +8,37 @@ import io
 
 ALLOWED_MIME = {"image/jpeg", "image/png"}
 EXT_FOR_MIME = {"image/jpeg": "jpg", "image/png": "png"}
+_UPLOAD_CHUNK = 64 * 1024
+
+class UploadTooLarge(ValueError):
+    pass
+
+async def read_upload(file: Any, max_bytes: int) -> bytes:
+    """
+    Read an UploadFile in chunks, refusing to buffer more than max_bytes.
+    Oversized uploads fail after max_bytes instead of being read into memory whole.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLarge(f"Image exceeds {max_bytes} bytes")
+    chunks: list[bytes] = []
+    size = 0
+    while chunk := await file.read(_UPLOAD_CHUNK):
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLarge(f"Image exceeds {max_bytes} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+# Leading signature bytes -> mime; checked before any Pillow decode so disguised or
+# unsupported uploads are rejected without paying for verify/pHash/EXIF work
+_MAGIC = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+)
 
 def sniff_mime(data: bytes) -> str | None:
-    # Use PIL to detect image format instead of deprecated imghdr
-    try:
-        with Image.open(io.BytesIO(data)) as img:
-            if img.format == "JPEG":
-                return "image/jpeg"
-            elif img.format == "PNG":
-                return "image/png"
-            return None
-    except Exception:
-        return None
+    head = data[:8]
+    return next((mime for magic, mime in _MAGIC if head.startswith(magic)), None)
 
 def analyze_image(data: bytes) -> Tuple[str, str, dict]:
     """
@@ -43,8 +62,22 @@ def analyze_image(data: bytes) -> Tuple[str, str, dict]:
             except Exception:
                 exif = {}
         return mime, str(ph), exif
-    except UnidentifiedImageError:
+    except (UnidentifiedImageError, OSError, SyntaxError):
+        # Right signature but undecodable/truncated body (Pillow raises OSError/SyntaxError)
         raise ValueError("Invalid image file")
 
+def phash_to_bits(phash_hex: str | None) -> int | None:
+    """
+    64-bit phash hex -> signed BIGINT (two's complement) for the submissions.phash_bits column.
+    Returns None for missing or malformed hashes.
+    """
+    if not phash_hex or len(phash_hex) > 16:
+        return None
+    try:
+        v = int(phash_hex, 16)
+    except ValueError:
+        return None
+    return v - (1 << 64) if v >= (1 << 63) else v
+
 def ext_for_mime(mime: str) -> str:
     return EXT_FOR_MIME.get(mime, "bin")
\ No newline at end of file
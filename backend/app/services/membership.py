@@ -0,0 +1,11 @@
+from __future__ import annotations
+from uuid import UUID
+from sqlalchemy import select, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.challenge import Participant
+
+async def is_participant(session: AsyncSession, challenge_id: UUID, user_id: UUID) -> bool:
+    """Membership check as a bare EXISTS: no Participant row is fetched or hydrated."""
+    return bool(await session.scalar(
+        select(exists().where(Participant.challenge_id == challenge_id, Participant.user_id == user_id))
+    ))
@@ -1,13 +1,17 @@
 from __future__ import annotations
 import os, hmac, hashlib, base64, io
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
 import piexif
 
 _OVERLAY_SECRET = os.getenv("OVERLAY_SECRET", "dev-overlay-secret-change-me").encode()
 
+@lru_cache(maxsize=8192)
 def overlay_code(challenge_id: str, participant_id: str, slot_key: str, length: int = 6) -> str:
     """
     Deterministic 6-char code per (challenge, participant, slot).
+    Pure in its inputs (secret is fixed per process), so it is memoized: the watermark
+    endpoint, upload and verify job all ask for the same code for a slot.
     """
     msg = f"{challenge_id}.{participant_id}.{slot_key}".encode()
     digest = hmac.new(_OVERLAY_SECRET, msg, hashlib.sha256).digest()
@@ -0,0 +1,18 @@
+from __future__ import annotations
+from app.cache import TTLCache
+from app.models.challenge import Challenge
+from app.schemas.challenge import RulesDSL
+
+# rules_json is validated on create and never edited in place, so parse it once per challenge
+_rules_by_challenge = TTLCache(maxsize=1024, ttl=300)
+
+def challenge_rules(ch: Challenge) -> RulesDSL:
+    """
+    Parsed RulesDSL for a challenge, cached by challenge id.
+    The returned model is shared between callers: treat it as read-only.
+    """
+    rules = _rules_by_challenge.get(ch.id)
+    if rules is None:
+        rules = RulesDSL.model_validate(ch.rules_json)
+        _rules_by_challenge.set(ch.id, rules)
+    return rules
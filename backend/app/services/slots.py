@@ -1,7 +1,6 @@
 from __future__ import annotations
 from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
-from app.services.time_windows import participant_window_utc
+from app.services.time_windows import participant_window_utc, zone
 
 
 def compute_slot(now_utc: datetime, frequency: str, start_t, end_t, scope: str, participant_tz: str, challenge_tz: str | None, custom_days: list[int] | None = None):
@@ -11,7 +10,7 @@ def compute_slot(now_utc: datetime, frequency: str, start_t, end_t, scope: str,
     """
     # Determine which tz governs the slot's anchor day
     tz_name = participant_tz if scope == "participant_local" else (challenge_tz or "UTC")
-    local_now = now_utc.astimezone(ZoneInfo(tz_name))
+    local_now = now_utc.astimezone(zone(tz_name))
     anchor = local_now.date()
 
     if frequency == "weekly":
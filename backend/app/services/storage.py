@@ -1,7 +1,10 @@
 from __future__ import annotations
 import io
+from typing import Iterator
+from fastapi.concurrency import run_in_threadpool
 from minio import Minio
 from minio.error import S3Error
+from app.cache import TTLCache
 from app.config import settings
 from datetime import timedelta
 
@@ -27,6 +30,10 @@ def put_bytes(key: str, data: bytes, content_type: str) -> None:
         settings.s3_bucket_uploads, key, io.BytesIO(data), length=len(data), content_type=content_type
     )
 
+def delete_object(key: str) -> None:
+    """Remove an object; deleting a missing key is not an error (S3 semantics)."""
+    _client.remove_object(settings.s3_bucket_uploads, key)
+
 def get_bytes(key: str) -> tuple[bytes, str]:
     """
     Retrieve object from storage.
@@ -42,10 +49,63 @@ def get_bytes(key: str) -> tuple[bytes, str]:
             raise FileNotFoundError(f"Object not found: {key}")
         raise
 
+def open_object(key: str, chunk_size: int = 64 * 1024) -> tuple[Iterator[bytes], str]:
+    """
+    Start downloading an object without reading its body.
+    Returns (chunk iterator, content_type); the iterator releases the connection when done.
+    """
+    try:
+        response = _client.get_object(settings.s3_bucket_uploads, key)
+    except S3Error as e:
+        if e.code == 'NoSuchKey':
+            raise FileNotFoundError(f"Object not found: {key}")
+        raise
+    content_type = response.headers.get('Content-Type', 'application/octet-stream')
+
+    def chunks() -> Iterator[bytes]:
+        try:
+            yield from response.stream(chunk_size)
+        finally:
+            response.close()
+            response.release_conn()
+
+    return chunks(), content_type
+
+# MinIO calls are blocking HTTP round-trips; request handlers await these instead
+async def put_bytes_async(key: str, data: bytes, content_type: str) -> None:
+    await run_in_threadpool(put_bytes, key, data, content_type)
+
+async def delete_object_async(key: str) -> None:
+    await run_in_threadpool(delete_object, key)
+
+async def open_object_async(key: str) -> tuple[Iterator[bytes], str]:
+    return await run_in_threadpool(open_object, key)
+
 def presign_get(key: str, expires_seconds: int | None = None) -> str:
     """
     Return a short-lived signed URL for downloading an object.
     Note: The URL will contain the object name but is time-limited and signed.
     """
     exp = timedelta(seconds=expires_seconds or settings.s3_presign_expiry_seconds)
-    return _client.presigned_get_object(settings.s3_bucket_uploads, key, expires=exp)
\ No newline at end of file
+    return _client.presigned_get_object(settings.s3_bucket_uploads, key, expires=exp)
+
+# Signed URLs per key, dropped a minute before they expire so a cached URL is always still usable.
+# Saves re-signing (HMAC) the same image for every list row and viewer.
+_presigned = TTLCache(maxsize=10000, ttl=min(settings.s3_presign_expiry_seconds - 60, 3600))
+
+def presign_get_cached(key: str) -> str:
+    """presign_get with the default expiry, memoized per key for most of the URL's lifetime."""
+    url = _presigned.get(key)
+    if url is None:
+        url = presign_get(key)
+        _presigned.set(key, url)
+    return url
+
+def media_url(key: str | None, proxy_path: str) -> str | None:
+    """
+    URL clients should fetch an object from: a signed storage URL when s3_presign_downloads
+    is on (bytes bypass the API), otherwise the authenticated API proxy path.
+    """
+    if not key:
+        return None
+    return presign_get_cached(key) if settings.s3_presign_downloads else proxy_path
@@ -1,8 +1,37 @@
 from __future__ import annotations
 from datetime import date, datetime, time, timedelta, timezone as dt_tz
+from functools import lru_cache
 from zoneinfo import ZoneInfo
 
 
+@lru_cache(maxsize=512)
+def zone(tz_name: str) -> ZoneInfo:
+    """ZoneInfo memoized per IANA name; skips ZoneInfo's own locked cache lookup on hot paths."""
+    return ZoneInfo(tz_name)
+
+
+# tz name -> (local midnight in UTC, next local midnight in UTC, ISO local date)
+_today_by_tz: dict[str, tuple[datetime, datetime, str]] = {}
+
+
+def local_today(now_utc: datetime, tz_name: str) -> str:
+    """
+    Local calendar date (YYYY-MM-DD, the slot_key format) in `tz_name` at `now_utc`.
+    Computed once per zone per local day; later calls are a bounds check.
+    """
+    hit = _today_by_tz.get(tz_name)
+    if hit is not None and hit[0] <= now_utc < hit[1]:
+        return hit[2]
+    tz = zone(tz_name)
+    d = now_utc.astimezone(tz).date()
+    nxt = d + timedelta(days=1)
+    start = datetime(d.year, d.month, d.day, tzinfo=tz).astimezone(dt_tz.utc)
+    end = datetime(nxt.year, nxt.month, nxt.day, tzinfo=tz).astimezone(dt_tz.utc)
+    if start <= now_utc < end:  # skip caching if a DST edge at midnight skews the bounds
+        _today_by_tz[tz_name] = (start, end, d.isoformat())
+    return d.isoformat()
+
+
 def local_window_to_utc(d: date, start_local: time, end_local: time, tz_name: str) -> tuple[datetime, datetime]:
     """
     Convert a local wall-clock window (start->end) on date `d` in timezone `tz_name`
@@ -28,7 +57,7 @@ def local_window_to_utc(d: date, start_local: time, end_local: time, tz_name: st
         >>> start.hour, end.hour
         (11, 4)  # 6 AM EST = 11 AM UTC, 11 PM EST = 4 AM UTC next day
     """
-    tz = ZoneInfo(tz_name)
+    tz = zone(tz_name)
 
     def _aware(d: date, t: time) -> datetime:
         # Pick fold=0 by default; callers can refine later if needed.
@@ -1,15 +1,51 @@
 from __future__ import annotations
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, text
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, text, table, column, event
 from datetime import datetime, timezone as dt_tz, timedelta
 from uuid import UUID
+from app.cache import TTLCache
 from app.models.wallet import WalletEntry
 from app.config import settings
 
 
+# wallet_allocations has no ORM model (rows are only ever inserted/summed); this lightweight
+# table clause is enough to join it into Core queries
+_allocations = table("wallet_allocations", column("deposit_entry_id"), column("tokens"))
+
+
+# GET /wallet snapshots per user, so dashboard polling doesn't re-read the whole history.
+# Writers below drop this process's copy; the short TTL bounds staleness on other workers.
+_snapshots = TTLCache(maxsize=4096, ttl=10)
+
+
 class InsufficientFunds(Exception):
     pass
 
+def cached_wallet_snapshot(user_id: UUID):
+    return _snapshots.get(user_id)
+
+def remember_wallet_snapshot(user_id: UUID, snapshot) -> None:
+    _snapshots.set(user_id, snapshot)
+
+def invalidate_wallet(user_id: UUID) -> None:
+    _snapshots.pop(user_id)
+
+def _mark_wallet_changed(session: AsyncSession, user_id: UUID) -> None:
+    # Dropped from the cache only once the write is committed (see _drop_changed_wallets):
+    # invalidating earlier lets a concurrent GET re-cache the pre-commit balance
+    session.info.setdefault("changed_wallets", set()).add(user_id)
+
+@event.listens_for(Session, "after_commit")
+def _drop_changed_wallets(session: Session) -> None:
+    for user_id in session.info.pop("changed_wallets", ()):
+        invalidate_wallet(user_id)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_changed_wallets(session: Session, previous_transaction) -> None:
+    # Rolled back: nothing was written, the cached snapshot is still right
+    session.info.pop("changed_wallets", None)
+
 async def wallet_balance(session: AsyncSession, user_id: UUID) -> int:
     total = await session.scalar(
         select(func.coalesce(func.sum(WalletEntry.amount), 0)).where(WalletEntry.user_id == user_id)
@@ -48,9 +84,43 @@ async def credit_deposit_idempotent(session: AsyncSession, *, user_id: UUID, ext
         external_id=external_id,
         note="stripe_deposit",
     ))
+    _mark_wallet_changed(session, user_id)
     return True
 
 
+async def deposit_lots(
+    session: AsyncSession, user_id: UUID, since: datetime | None = None, needed: int | None = None
+) -> list:
+    """
+    DEPOSIT lots that still have unallocated tokens, oldest first, as (id, external_id, remaining) rows.
+    One grouped query: allocations are summed per lot in SQL and exhausted lots are dropped there.
+    With `needed`, only the FIFO prefix that covers that many tokens is returned.
+    """
+    remaining = WalletEntry.amount - func.coalesce(func.sum(_allocations.c.tokens), 0)
+    fifo = (WalletEntry.created_at.asc(), WalletEntry.id.asc())  # id breaks created_at ties
+    lots = (
+        select(
+            WalletEntry.id, WalletEntry.external_id, WalletEntry.created_at,
+            remaining.label("remaining"),
+            # Running total of remaining tokens in FIFO order (window runs after GROUP BY/HAVING)
+            func.sum(remaining).over(order_by=fifo).label("cum"),
+        )
+        .outerjoin(_allocations, _allocations.c.deposit_entry_id == WalletEntry.id)
+        .where(WalletEntry.user_id == user_id, WalletEntry.type == "DEPOSIT")
+        .group_by(WalletEntry.id)
+        .having(remaining > 0)
+    )
+    if since is not None:
+        lots = lots.where(WalletEntry.created_at >= since)
+    lots = lots.subquery()
+
+    stmt = select(lots.c.id, lots.c.external_id, lots.c.remaining).order_by(lots.c.created_at, lots.c.id)
+    if needed is not None:
+        # Keep a lot while the tokens before it fall short of `needed`
+        stmt = stmt.where(lots.c.cum - lots.c.remaining < needed)
+    return (await session.execute(stmt)).all()
+
+
 async def _advisory_lock_wallet(session: AsyncSession, user_id: UUID):
     """Prevent double-spend races across concurrent requests."""
     await session.execute(text("SELECT pg_advisory_xact_lock(hashtext(:k))"), {"k": f"wallet:{user_id}"})
@@ -98,29 +168,16 @@ async def debit_tokens(
     )
     session.add(withdraw)
     await session.flush()  # get withdraw.id
+    _mark_wallet_changed(session, user_id)
 
     if allocate_fifo:
         # Allocate against oldest DEPOSITs with remaining > 0
         # remaining = deposit.amount - sum(allocation.tokens)
-        deposits = (await session.execute(
-            select(WalletEntry)
-            .where(WalletEntry.user_id == user_id, WalletEntry.type == "DEPOSIT")
-            .order_by(WalletEntry.created_at.asc())
-        )).scalars().all()
-
         remaining = tokens
-        for dep in deposits:
+        for dep in await deposit_lots(session, user_id, needed=tokens):
             if remaining <= 0:
                 break
-            used = await session.scalar(
-                select(func.coalesce(func.sum(text("tokens")), 0))
-                .select_from(text("wallet_allocations"))
-                .where(text("deposit_entry_id = :d")), {"d": str(dep.id)}
-            ) or 0
-            avail = int(dep.amount) - int(used)
-            if avail <= 0:
-                continue
-            take = min(avail, remaining)
+            take = min(int(dep.remaining), remaining)
             await session.execute(text("""
                 INSERT INTO wallet_allocations (user_id, withdraw_entry_id, deposit_entry_id, tokens)
                 VALUES (:u, :w, :d, :t)
@@ -162,4 +219,5 @@ async def credit_tokens(
         note=note
     )
     session.add(e)
+    _mark_wallet_changed(session, user_id)
     return e
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""store submission phash as bigint
+
+Revision ID: 20261015_0018
+Revises: 20251016_0015
+Create Date: 2026-10-15 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261015_0018'
+down_revision = '20251016_0015'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('submissions', sa.Column('phash_bits', sa.BigInteger(), nullable=True))
+
+    # Backfill from the hex phash in meta_json (same precedence the verify job used)
+    op.execute("""
+        UPDATE submissions
+        SET phash_bits = ('x' || lpad(h.ph, 16, '0'))::bit(64)::bigint
+        FROM (
+            SELECT id, coalesce(meta_json->>'original_phash', meta_json->>'phash') AS ph
+            FROM submissions
+        ) AS h
+        WHERE submissions.id = h.id
+          AND h.ph ~ '^[0-9a-fA-F]{1,16}$'
+    """)
+
+    # Cover the verify lookup: (participant, recency) -> id, phash_bits.
+    # meta_json is deliberately not INCLUDEd: a JSONB document with EXIF data can exceed
+    # the ~2.7kB btree tuple limit and would make the submission INSERT fail.
+    op.create_index(
+        'ix_submissions_participant_submitted',
+        'submissions',
+        ['participant_id', sa.text('submitted_at DESC')],
+        unique=False,
+        postgresql_include=['id', 'phash_bits'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_submissions_participant_submitted', table_name='submissions')
+    op.drop_column('submissions', 'phash_bits')
@@ -0,0 +1,30 @@
+"""covering index for authenticated user lookups
+
+Revision ID: 20261015_0019
+Revises: 20261015_0018
+Create Date: 2026-10-15 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261015_0019'
+down_revision = '20261015_0018'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_users_id_covering',
+        'users',
+        ['id'],
+        unique=False,
+        postgresql_include=['email', 'username', 'created_at'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_id_covering', table_name='users')
@@ -0,0 +1,32 @@
+"""denormalized participant count on challenges
+
+Revision ID: 20261015_0020
+Revises: 20261015_0019
+Create Date: 2026-10-15 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261015_0020'
+down_revision = '20261015_0019'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'challenges',
+        sa.Column('participant_count', sa.Integer(), nullable=False, server_default=sa.text('0')),
+    )
+    # Backfill; the same statement can be re-run to reconcile drift (e.g. user deletes cascading)
+    op.execute("""
+        UPDATE challenges c
+        SET participant_count = (SELECT count(*) FROM participants p WHERE p.challenge_id = c.id)
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('challenges', 'participant_count')
@@ -0,0 +1,32 @@
+"""newest-first submissions per challenge index
+
+Revision ID: 20261015_0021
+Revises: 20261015_0020
+Create Date: 2026-10-15 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261015_0021'
+down_revision = '20261015_0020'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # (challenge_id, submitted_at DESC, id DESC) serves keyset pages and supersedes the single-column index
+    op.create_index(
+        'ix_submissions_challenge_submitted',
+        'submissions',
+        ['challenge_id', sa.text('submitted_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+    op.drop_index('ix_submissions_challenge_id', table_name='submissions')
+
+
+def downgrade() -> None:
+    op.create_index('ix_submissions_challenge_id', 'submissions', ['challenge_id'])
+    op.drop_index('ix_submissions_challenge_submitted', table_name='submissions')
@@ -0,0 +1,42 @@
+"""unique submission sequence per participant slot
+
+Revision ID: 20261015_0022
+Revises: 20261015_0021
+Create Date: 2026-10-15 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261015_0022'
+down_revision = '20261015_0021'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Concurrent submits could have written the same sequence twice; renumber by submit order first
+    op.execute("""
+        UPDATE submissions s
+        SET submission_sequence = r.rn
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY participant_id, slot_key ORDER BY submitted_at, id) AS rn
+            FROM submissions
+        ) r
+        WHERE s.id = r.id AND s.submission_sequence <> r.rn
+    """)
+    # Unique (participant_id, slot_key, submission_sequence) also covers the old (participant_id, slot_key) index
+    op.create_index(
+        'uq_submissions_participant_slot_sequence',
+        'submissions',
+        ['participant_id', 'slot_key', 'submission_sequence'],
+        unique=True,
+    )
+    op.drop_index('ix_submission_participant_slot', table_name='submissions')
+
+
+def downgrade() -> None:
+    op.create_index('ix_submission_participant_slot', 'submissions', ['participant_id', 'slot_key'], unique=False)
+    op.drop_index('uq_submissions_participant_slot_sequence', table_name='submissions')
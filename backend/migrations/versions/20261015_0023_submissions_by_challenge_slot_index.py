@@ -0,0 +1,33 @@
+"""submissions per challenge slot day index
+
+Revision ID: 20261015_0023
+Revises: 20261015_0022
+Create Date: 2026-10-15 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261015_0023'
+down_revision = '20261015_0022'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Day-filtered submission pages: equality on (challenge_id, slot_key), newest first.
+    # Replaces the slot_key-only index, which no query uses without challenge/participant.
+    op.create_index(
+        'ix_submissions_challenge_slot_submitted',
+        'submissions',
+        ['challenge_id', 'slot_key', sa.text('submitted_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+    op.drop_index('ix_submissions_slot_key', table_name='submissions')
+
+
+def downgrade() -> None:
+    op.create_index('ix_submissions_slot_key', 'submissions', ['slot_key'])
+    op.drop_index('ix_submissions_challenge_slot_submitted', table_name='submissions')
@@ -0,0 +1,55 @@
+"""review and ledger composite indexes
+
+Revision ID: 20261015_0024
+Revises: 20261015_0023
+Create Date: 2026-10-15 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261015_0024'
+down_revision = '20261015_0023'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Review lists and stats: challenge + status equality, newest first
+    op.create_index(
+        'ix_submissions_challenge_status_submitted',
+        'submissions',
+        ['challenge_id', 'status', sa.text('submitted_at DESC')],
+        unique=False,
+    )
+    # "My votes today" counter: voter equality + created_at range.
+    # Supersedes the voter-only index; submission_id lookups are already served by
+    # uq_vote_once_per_voter (submission_id, voter_participant_id).
+    op.create_index(
+        'ix_votes_voter_created',
+        'votes',
+        ['voter_participant_id', 'created_at'],
+        unique=False,
+    )
+    op.drop_index('ix_votes_voter_participant_id', table_name='votes')
+    op.drop_index('ix_votes_submission_id', table_name='votes')
+    # Per-participant entries by type over a time window (platform revenue stats).
+    # participant_id-only lookups are covered by this and uq_ledger_unique_ref.
+    op.create_index(
+        'ix_ledger_participant_type_created',
+        'ledger',
+        ['participant_id', 'type', sa.text('created_at DESC')],
+        unique=False,
+    )
+    op.drop_index('ix_ledger_participant_id', table_name='ledger')
+
+
+def downgrade() -> None:
+    op.create_index('ix_ledger_participant_id', 'ledger', ['participant_id'])
+    op.drop_index('ix_ledger_participant_type_created', table_name='ledger')
+    op.create_index('ix_votes_submission_id', 'votes', ['submission_id'])
+    op.create_index('ix_votes_voter_participant_id', 'votes', ['voter_participant_id'])
+    op.drop_index('ix_votes_voter_created', table_name='votes')
+    op.drop_index('ix_submissions_challenge_status_submitted', table_name='submissions')
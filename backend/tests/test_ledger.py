@@ -0,0 +1,13 @@
+from __future__ import annotations
+from datetime import date, timedelta
+from app.services.ledger import _weekdays_inclusive
+
+
+def test_weekdays_inclusive_matches_day_by_day_count():
+    start = date(2025, 1, 1)  # a Wednesday
+    for offset in range(7):
+        a = start + timedelta(days=offset)
+        for span in range(0, 40):
+            b = a + timedelta(days=span)
+            expected = sum(1 for i in range(span + 1) if (a + timedelta(days=i)).weekday() < 5)
+            assert _weekdays_inclusive(a, b) == expected
@@ -0,0 +1,22 @@
+from __future__ import annotations
+import io
+import pytest
+from starlette.datastructures import UploadFile
+from app.services.media import analyze_image, read_upload, sniff_mime, UploadTooLarge
+
+
+async def test_read_upload_reads_all_chunks_and_caps_size():
+    payload = b"x" * (200 * 1024)
+    assert await read_upload(UploadFile(io.BytesIO(payload)), len(payload)) == payload
+    with pytest.raises(UploadTooLarge):
+        await read_upload(UploadFile(io.BytesIO(payload)), len(payload) - 1)
+
+
+def test_magic_byte_gate_runs_before_decoding():
+    assert sniff_mime(b"\xff\xd8\xff\xe0rest") == "image/jpeg"
+    assert sniff_mime(b"\x89PNG\r\n\x1a\nrest") == "image/png"
+    assert sniff_mime(b"GIF89a") is None and sniff_mime(b"") is None
+    with pytest.raises(ValueError, match="Unsupported"):
+        analyze_image(b"<svg xmlns='http://www.w3.org/2000/svg'/>")
+    with pytest.raises(ValueError, match="Invalid"):
+        analyze_image(b"\xff\xd8\xff" + b"\x00" * 64)
@@ -0,0 +1,36 @@
+from __future__ import annotations
+import jwt
+import pytest
+from app import security
+from app.cache import TTLCache
+
+
+def test_decode_token_cached_reuses_claims():
+    token = security.make_access_token("user-1")
+    first = security.decode_token_cached(token)
+    assert first["sub"] == "user-1" and first["type"] == "access"
+    # Second call is served from the cache (same claims object)
+    assert security.decode_token_cached(token) is first
+
+
+def test_decode_token_cached_does_not_cache_failures():
+    with pytest.raises(jwt.InvalidTokenError):
+        security.decode_token_cached("not-a-token")
+    assert security._decoded_tokens.get("not-a-token") is None
+
+
+def test_decode_token_cached_skips_expired_tokens():
+    token = jwt.encode({"sub": "user-2", "type": "access", "exp": 1}, security.JWT_SECRET, algorithm=security.JWT_ALG)
+    with pytest.raises(jwt.ExpiredSignatureError):
+        security.decode_token_cached(token)
+
+
+def test_ttl_cache_evicts_oldest_and_expires():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2 and cache.get("c") == 3
+    cache.set("d", 4, ttl=0)  # non-positive ttl is never stored
+    assert cache.get("d") is None
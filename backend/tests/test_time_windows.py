@@ -164,4 +164,14 @@ def test_various_timezones_standard_time(tz_name, expected_offset_hours):
     
     # Calculate expected UTC hour
     expected_utc_hour = (12 - expected_offset_hours) % 24
-    assert s_utc.hour == expected_utc_hour
\ No newline at end of file
+    assert s_utc.hour == expected_utc_hour
+
+def test_local_today_per_zone_and_cached_until_midnight():
+    from datetime import datetime
+    from app.services import time_windows
+    now = datetime(2025, 1, 10, 3, 0, tzinfo=timezone.utc)  # still Jan 9 in New York
+    assert time_windows.local_today(now, "America/New_York") == "2025-01-09"
+    assert time_windows.local_today(now, "Asia/Tokyo") == "2025-01-10"
+    start, end, _ = time_windows._today_by_tz["America/New_York"]
+    assert (start.hour, end.hour) == (5, 5)  # NY midnights (EST) in UTC
+    assert time_windows.local_today(datetime(2025, 1, 10, 5, 0, tzinfo=timezone.utc), "America/New_York") == "2025-01-10"
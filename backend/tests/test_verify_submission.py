@@ -0,0 +1,33 @@
+from __future__ import annotations
+from datetime import datetime
+from app.jobs.verify_submission import _parse_exif_datetime
+from app.services.media import phash_to_bits
+
+
+def test_phash_to_bits_is_signed_64bit():
+    assert phash_to_bits("0000000000000001") == 1
+    assert phash_to_bits("7fffffffffffffff") == 2**63 - 1
+    assert phash_to_bits("ffffffffffffffff") == -1
+    assert phash_to_bits("8000000000000000") == -(2**63)
+    # XOR popcount (what Postgres computes) matches the hex Hamming distance
+    assert bin((phash_to_bits("ffffffffffffffff") ^ phash_to_bits("0f0f0f0f0f0f0f0f")) & (2**64 - 1)).count("1") == 32
+
+
+def test_phash_to_bits_rejects_bad_data():
+    assert phash_to_bits(None) is None
+    assert phash_to_bits("") is None
+    assert phash_to_bits("not-hex") is None
+    assert phash_to_bits("1" * 17) is None
+
+
+def test_parse_exif_datetime_original_and_fallback():
+    meta = {"exif": {"Exif": {"36867": "2025:01:10 18:30:05"}, "0th": {"306": "2024:12:31 00:00:00"}}}
+    assert _parse_exif_datetime(meta) == datetime(2025, 1, 10, 18, 30, 5)
+    meta = {"exif": {"0th": {"306": b"2024:12:31 23:59:59\x00"}}}
+    assert _parse_exif_datetime(meta) == datetime(2024, 12, 31, 23, 59, 59)
+
+
+def test_parse_exif_datetime_missing_or_garbage():
+    assert _parse_exif_datetime({}) is None
+    assert _parse_exif_datetime({"exif": {"Exif": {"36867": "    :  :     :  :  "}}}) is None
+    assert _parse_exif_datetime({"exif": {"Exif": {"36867": "2025:13:40 99:00:00"}}}) is None
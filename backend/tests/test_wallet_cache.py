@@ -0,0 +1,26 @@
+from __future__ import annotations
+import uuid
+from sqlalchemy.orm import Session
+from app.services import wallet
+
+
+def test_wallet_snapshot_dropped_only_after_commit():
+    uid = uuid.uuid4()
+    session = Session()
+    wallet.remember_wallet_snapshot(uid, "old")
+    wallet._mark_wallet_changed(session, uid)
+    # Not committed yet: a GET would still see (and re-cache) the old balance, so keep it
+    assert wallet.cached_wallet_snapshot(uid) == "old"
+    session.commit()
+    assert wallet.cached_wallet_snapshot(uid) is None
+
+
+def test_wallet_snapshot_kept_on_rollback():
+    uid = uuid.uuid4()
+    session = Session()
+    wallet.remember_wallet_snapshot(uid, "current")
+    session.begin()
+    wallet._mark_wallet_changed(session, uid)
+    session.rollback()
+    session.commit()
+    assert wallet.cached_wallet_snapshot(uid) == "current"